@@ -2,51 +2,27 @@
 # pip install transformers torch torchvision accelerate bitsandbytes
 # pip install pandas Pillow
 
-import pandas as pd
-from transformers import LlavaNextProcessor, LlavaNextForConditionalGeneration
-import torch
+import argparse
 import time
-import gc
 import os
+import sys
+import json
+import queue
+import threading
 from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import requests
 from io import BytesIO
-import numpy as np
 
-def setup_llava_model():
-    
-    # Clear GPU memory first
-    torch.cuda.empty_cache()
-    gc.collect()
-    
-    # Set optimal PyTorch settings for A100
-    torch.backends.cudnn.benchmark = True
-    torch.backends.cudnn.enabled = True
-    
-    processor = LlavaNextProcessor.from_pretrained("llava-hf/llava-v1.6-mistral-7b-hf")
-    
-    # For A100 80GB - use full precision and no quantization for maximum speed
-    model = LlavaNextForConditionalGeneration.from_pretrained(
-        "llava-hf/llava-v1.6-mistral-7b-hf", 
-        torch_dtype=torch.float16,  # Use fp16 for speed while maintaining quality
-        low_cpu_mem_usage=True,
-        device_map="auto",
-        # Remove quantization for A100 - we have enough VRAM
-        # load_in_4bit=False,  # Disabled for A100
-        trust_remote_code=True
-    )
-    
-    # Enable model compilation for faster inference (PyTorch 2.0+)
-    if hasattr(torch, 'compile'):
-        print("Compiling model for optimal A100 performance...")
-        model = torch.compile(model, mode="max-autotune")
-    
-    print(f"Model loaded successfully!")
-    print(f"GPU Memory: {torch.cuda.memory_allocated()/1024**3:.2f} GB allocated")
-    print(f"GPU Memory Reserved: {torch.cuda.memory_reserved()/1024**3:.2f} GB")
-    
-    return processor, model
+from backends import check_gpu_status, create_backend, BACKENDS
+from dedupe import NearDuplicateIndex, dhash, mean_color
+
+# Reuse the dataset loader from utils/ (project root is two levels up)
+UTILS_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "utils"))
+if UTILS_PATH not in sys.path:
+    sys.path.insert(0, UTILS_PATH)
+
+from preprocess import load_unified_dataset
 
 def download_image_batch(urls, max_workers=20):
     """Download images in parallel for faster processing"""
@@ -65,207 +41,297 @@ def download_image_batch(urls, max_workers=20):
     
     return {url: img for url, img in results if img is not None}
 
-def analyze_clothing_features_batch(image_batch, processor, model):
-    """Analyze multiple clothing items in a single batch for maximum GPU utilization"""
-    batch_results = {}
+def prepare_batch(image_batch, backend):
+    """CPU stage: image preprocessing and tokenization for a batch, ready for generate()"""
+    urls = [url for url, image in image_batch.items() if image is not None]
+    images = [image_batch[url] for url in urls]
     
-    # Prepare batch data
-    prompts = []
-    images = []
-    urls = []
+    prepared = None
+    if images:
+        try:
+            prepared = backend.prepare(images)
+        except Exception as e:
+            print(f"Error preprocessing batch: {str(e)}")
     
-    prompt_template = """[INST] <image>
-Analyze this clothing item and describe its key features including:
-- Type of clothing (shirt, dress, pants, etc.)
-- Color(s)
-- Pattern (solid, striped, floral, etc.)
-- Material/fabric texture if visible
-- Style details (sleeves, collar, fit, etc.)
-- Any notable design elements
+    return urls, images, prepared
 
-Provide a concise description focusing on the main clothing features. [/INST]"""
-
-    for url, image in image_batch.items():
-        if image is not None:
-            prompts.append(prompt_template)
-            images.append(image)
-            urls.append(url)
+def generate_batch(urls, images, prepared, backend):
+    """Model stage: generate descriptions for a prepared batch"""
+    batch_results = {}
     
     if not images:
         return batch_results
     
     try:
-        # Process batch
-        inputs = processor(text=prompts, images=images, return_tensors="pt", padding=True)
-        
-        # Move to GPU
-        if torch.cuda.is_available():
-            inputs = {k: v.to(model.device) for k, v in inputs.items() if isinstance(v, torch.Tensor)}
-        
-        # Generate responses for the entire batch
-        with torch.no_grad():
-            outputs = model.generate(
-                **inputs,
-                max_new_tokens=200,
-                do_sample=False,
-                temperature=0.1,
-                pad_token_id=processor.tokenizer.eos_token_id,
-                # Optimize for batch processing
-                use_cache=True,
-                num_beams=1  # Faster than beam search
-            )
-        
-        # Decode responses
-        for i, (url, output) in enumerate(zip(urls, outputs)):
-            response = processor.decode(output, skip_special_tokens=True)
-            
-            # Extract just the generated part
-            if "[/INST]" in response:
-                features = response.split("[/INST]")[-1].strip()
-            else:
-                features = response.strip()
-            
-            batch_results[url] = features
-            
+        if prepared is None:
+            raise ValueError("batch preprocessing failed")
+        batch_results = dict(zip(urls, backend.generate(prepared)))
     except Exception as e:
         print(f"Error in batch processing: {str(e)}")
         # Fallback to individual processing
         for url, image in zip(urls, images):
-            batch_results[url] = analyze_single_image(url, image, processor, model)
+            batch_results[url] = analyze_single_image(url, image, backend)
     
     return batch_results
 
-def analyze_single_image(url, image, processor, model):
+def analyze_clothing_features_batch(image_batch, backend):
+    """Analyze multiple clothing items in a single batch for maximum accelerator utilization"""
+    return generate_batch(*prepare_batch(image_batch, backend), backend)
+
+def analyze_single_image(url, image, backend):
     """Fallback function for individual image analysis"""
     try:
-        prompt = """[INST] <image>
-Analyze this clothing item and describe its key features including:
-- Type of clothing (shirt, dress, pants, etc.)
-- Color(s)
-- Pattern (solid, striped, floral, etc.)
-- Material/fabric texture if visible
-- Style details (sleeves, collar, fit, etc.)
-- Any notable design elements
-
-Provide a concise description focusing on the main clothing features. [/INST]"""
-
-        inputs = processor(text=prompt, images=image, return_tensors="pt")
-        
-        if torch.cuda.is_available():
-            inputs = {k: v.to(model.device) for k, v in inputs.items() if isinstance(v, torch.Tensor)}
-        
-        with torch.no_grad():
-            output = model.generate(
-                **inputs,
-                max_new_tokens=200,
-                do_sample=False,
-                temperature=0.1,
-                pad_token_id=processor.tokenizer.eos_token_id
-            )
-        
-        response = processor.decode(output[0], skip_special_tokens=True)
-        
-        if "[/INST]" in response:
-            features = response.split("[/INST]")[-1].strip()
-        else:
-            features = response.strip()
-            
-        return features
-        
+        return backend.describe_one(image)
     except Exception as e:
         print(f"Error analyzing single image {url}: {str(e)}")
         return ""
 
-def process_clothing_features(csv_file_path, output_file_path=None, batch_size=32):
-    """Main function optimized for A100 80GB GPU with batch processing"""
+_DONE = object()
+
+def run_overlapped_pipeline(url_batches, backend, on_batch_done, queue_size=2,
+                            download_workers=20, preprocess_workers=1, dedupe=None):
+    """
+    Run download/decode -> preprocessing -> generation as concurrent stages.
+
+    A downloader thread and `preprocess_workers` CPU threads feed bounded queues
+    of at most `queue_size` batches, so the next batches are downloaded and
+    tokenized while the model generates the current one, and throughput tends
+    toward that of the slowest stage. `on_batch_done(batch_results)` is called
+    from the calling thread after each generated batch.
+
+    `backend.prepare()` must be safe to call from several threads before raising
+    `preprocess_workers` above 1: HF fast tokenizers are not, and fail with
+    "Already borrowed" when a processor is shared across threads.
+
+    With a `NearDuplicateIndex`, downloaded images that are near-identical to one
+    already seen are dropped before preprocessing, and each generated description
+    is fanned out to the rest of its group in `batch_results`.
+
+    Returns:
+        dict: Seconds each stage spent working
+    """
+    downloaded = queue.Queue(maxsize=queue_size)
+    prepared = queue.Queue(maxsize=queue_size)
+    busy = {"download": 0.0, "preprocess": 0.0, "generate": 0.0}
+    busy_lock = threading.Lock()
+    stop = threading.Event()
+    
+    def put(q, item):
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def get(q):
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+        return _DONE
+    
+    def add_busy(stage, started):
+        with busy_lock:
+            busy[stage] += time.time() - started
+    
+    def download_stage():
+        try:
+            for urls in url_batches:
+                started = time.time()
+                image_batch = download_image_batch(urls, max_workers=download_workers)
+                downloaded_count = len(image_batch)
+                if dedupe is not None:
+                    image_batch = {url: image for url, image in image_batch.items()
+                                   if dedupe.add(url, dhash(image), mean_color(image)) == url}
+                add_busy("download", started)
+                print(f"📥 Downloaded {downloaded_count}/{len(urls)} images "
+                      f"({downloaded_count - len(image_batch)} near-duplicates skipped)")
+                if not put(downloaded, image_batch):
+                    return
+        finally:
+            for _ in range(preprocess_workers):
+                put(downloaded, _DONE)
+    
+    def preprocess_stage():
+        try:
+            while True:
+                image_batch = get(downloaded)
+                if image_batch is _DONE:
+                    return
+                started = time.time()
+                prepared_batch = prepare_batch(image_batch, backend)
+                add_busy("preprocess", started)
+                if not put(prepared, prepared_batch):
+                    return
+        finally:
+            put(prepared, _DONE)
+    
+    threads = [threading.Thread(target=download_stage, name="vision-download", daemon=True)]
+    threads += [threading.Thread(target=preprocess_stage, name=f"vision-preprocess-{i}", daemon=True)
+                for i in range(preprocess_workers)]
+    for thread in threads:
+        thread.start()
+    
+    # Generation stays on the calling thread and consumes batches as soon as they are ready
+    finished = 0
+    try:
+        while finished < preprocess_workers:
+            item = get(prepared)
+            if item is _DONE:
+                finished += 1
+                continue
+            started = time.time()
+            batch_results = generate_batch(*item, backend)
+            add_busy("generate", started)
+            if dedupe is not None:
+                batch_results = dedupe.expand(batch_results)
+            on_batch_done(batch_results)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=5)
+    
+    return busy
+
+class ResultsLog:
+    """
+    Append-only JSONL log of generated descriptions keyed by image_url.
+
+    Each batch appends one line per described image, so saving progress costs
+    the size of the batch rather than the whole catalog, and a restarted run
+    skips every image already in the log. A torn last line from a crash is ignored.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    self.results[entry["image_url"]] = entry["clothing_features"]
+        self._file = open(path, "a", encoding="utf-8")
+        if self._file.tell() and not self._ends_with_newline():
+            self._file.write("\n")  # Terminate a torn line so the next entry starts cleanly
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def __contains__(self, image_url):
+        return image_url in self.results
+
+    def __len__(self):
+        return len(self.results)
+
+    def append(self, batch_results):
+        """Record a batch of {image_url: features}; empty descriptions are left for a retry"""
+        for url, features in batch_results.items():
+            if not features:
+                continue
+            self.results[url] = features
+            self._file.write(json.dumps({"image_url": url, "clothing_features": features}, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+def results_log_path_for(output_file_path):
+    return os.path.splitext(output_file_path)[0] + ".results.jsonl"
+
+def compact_results(df, results_log, output_file_path):
+    """Join the results log onto the product table and write the final CSV once"""
+    df['clothing_features'] = df['image_url'].map(results_log.results).fillna("")
+    df.to_csv(output_file_path, index=False)
+    return df
+
+def process_clothing_features(csv_file_path, output_file_path=None, batch_size=32, backend=None):
+    """
+    Describe every product image with a vision backend, resuming from the results log.
+
+    `backend` is a `backends.VisionBackend` (or a backend name); by default LLaVA
+    on a GPU machine and the int8 CPU captioner otherwise. It is only loaded when
+    there are images left to describe.
+    """
+    
+    if output_file_path is None:
+        output_file_path = csv_file_path.replace('.csv', '_with_features.csv')
     
     # Load the CSV file
     print("Loading CSV file...")
-    df = pd.read_csv(csv_file_path)
+    # Uses the Parquet copy written by utils/preprocess.py when it is current
+    df = load_unified_dataset(csv_file_path)
     
-    # Initialize the clothing_features column
-    df['clothing_features'] = ""
+    # Resume from the results log: only images without a description are processed
+    results_log = ResultsLog(results_log_path_for(output_file_path))
+    valid_urls = df.loc[df['image_url'].notna() & (df['image_url'] != ""), 'image_url'].unique().tolist()
+    pending_urls = [url for url in valid_urls if url not in results_log]
+    total_rows = len(pending_urls)
+    if len(results_log):
+        print(f"↩️  Resuming: {len(valid_urls) - total_rows}/{len(valid_urls)} images already described in {results_log.path}")
     
-    # Setup LLaVA model
-    print("Setting up LLaVA 1.6 model...")
-    processor, model = setup_llava_model()
+    if pending_urls and not hasattr(backend, "generate"):
+        backend = create_backend(backend)
     
-    # Filter out rows with missing URLs
-    valid_rows = df[df['image_url'].notna() & (df['image_url'] != "")]
-    total_rows = len(valid_rows)
     print(f"Processing {total_rows} images in batches of {batch_size}...")
     
-    # Process in batches for maximum A100 utilization
+    # Downloads and preprocessing for upcoming batches overlap generation of the current one
     processed = 0
+    batch_count = 0
     start_time = time.time()
     
-    for batch_start in range(0, total_rows, batch_size):
-        batch_end = min(batch_start + batch_size, total_rows)
-        batch_rows = valid_rows.iloc[batch_start:batch_end]
-        
-        print(f"\nProcessing batch {batch_start//batch_size + 1}/{(total_rows-1)//batch_size + 1}")
-        print(f"Images {batch_start + 1}-{batch_end} of {total_rows}")
+    def on_batch_done(batch_results):
+        nonlocal processed, batch_count
+        batch_count += 1
         
-        # Download images in parallel
-        urls = batch_rows['image_url'].tolist()
-        print(f"Downloading {len(urls)} images...")
-        image_batch = download_image_batch(urls, max_workers=20)
-        
-        print(f"Successfully downloaded {len(image_batch)}/{len(urls)} images")
-        
-        # Analyze batch
-        if image_batch:
-            print("Analyzing clothing features...")
-            batch_results = analyze_clothing_features_batch(image_batch, processor, model)
-            
-            # Update dataframe
-            for idx in batch_rows.index:
-                url = df.at[idx, 'image_url']
-                if url in batch_results:
-                    df.at[idx, 'clothing_features'] = batch_results[url]
-                    processed += 1
+        # Save progress: append this batch only
+        results_log.append(batch_results)
+        processed += sum(1 for features in batch_results.values() if features)
         
         # Progress reporting
         elapsed = time.time() - start_time
         rate = processed / elapsed if elapsed > 0 else 0
         eta = (total_rows - processed) / rate if rate > 0 else 0
         
-        print(f"✅ Batch complete. Processed: {processed}/{total_rows}")
+        print(f"\n✅ Batch {batch_count}/{(total_rows-1)//batch_size + 1} complete. Processed: {processed}/{total_rows}")
         print(f"⚡ Rate: {rate:.2f} images/second")
         print(f"⏱️  ETA: {eta/60:.1f} minutes")
+        print(f"💾 Progress saved to {results_log.path}")
         
-        # Save progress
-        if output_file_path is None:
-            output_file_path = csv_file_path.replace('.csv', '_with_features.csv')
+        backend.release_memory()
+    
+    if pending_urls:
+        url_batches = (pending_urls[i:i + batch_size] for i in range(0, total_rows, batch_size))
+        dedupe = NearDuplicateIndex()
+        busy = run_overlapped_pipeline(url_batches, backend, on_batch_done, dedupe=dedupe)
         
-        df.to_csv(output_file_path, index=False)
-        print(f"💾 Progress saved to {output_file_path}")
+        # Images that joined a group after its representative was described
+        late_members = {url: results_log.results[representative]
+                        for representative, members in dedupe.groups().items() if representative in results_log
+                        for url in members if url not in results_log}
+        results_log.append(late_members)
         
-        # Clear GPU cache
-        torch.cuda.empty_cache()
-        gc.collect()
+        dedupe_stats = dedupe.stats()
+        print(f"\n🧬 {dedupe_stats['duplicates']} near-duplicate images reused the description "
+              f"of one of {dedupe_stats['groups']} unique images")
+        elapsed = time.time() - start_time
+        print(f"\n⏱️  Stage time: download {busy['download']:.1f}s, preprocess {busy['preprocess']:.1f}s, "
+              f"generate {busy['generate']:.1f}s (wall clock {elapsed:.1f}s)")
+        print(f"⚡ {processed / elapsed if elapsed > 0 else 0:.2f} images/second with the '{backend.name}' backend")
     
+    results_log.close()
+    df = compact_results(df, results_log, output_file_path)
     print(f"\n🎉 Processing complete! Final results saved to {output_file_path}")
     
     return df
 
-def check_gpu_status():
-    """Check GPU availability and memory"""
-    if torch.cuda.is_available():
-        for i in range(torch.cuda.device_count()):
-            gpu_name = torch.cuda.get_device_name(i)
-            total_memory = torch.cuda.get_device_properties(i).total_memory / 1024**3
-            print(f"✅ GPU {i}: {gpu_name}")
-            print(f"   Total Memory: {total_memory:.2f} GB")
-            
-        print(f"🔥 CUDA Version: {torch.version.cuda}")
-        print(f"⚡ PyTorch Version: {torch.__version__}")
-    else:
-        print("❌ No GPU available")
-
-# Check GPU status first
-check_gpu_status()
-
 # Usage example
 if __name__ == "__main__":
     # Resolve project root and file paths relative to this script location
@@ -273,12 +339,19 @@ if __name__ == "__main__":
     input_file = os.path.join(PROJECT_ROOT, "data", "all_products.csv")
     output_file = os.path.join(PROJECT_ROOT, "final_products_complete.csv")
     
+    parser = argparse.ArgumentParser(description="Generate clothing descriptions for product images")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=None,
+                        help="Inference backend (default: llava with a GPU, cpu otherwise)")
     # Adjust batch size based on your A100 memory usage
     # Start with 32, increase to 64 or higher if memory allows
-    batch_size = 32
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+    
+    # Check GPU status first
+    check_gpu_status()
     
     # Process the file
-    result_df = process_clothing_features(input_file, output_file, batch_size=batch_size)
+    result_df = process_clothing_features(input_file, output_file, batch_size=args.batch_size, backend=args.backend)
     
     # Print summary
     successful_analyses = (result_df['clothing_features'] != "").sum()
@@ -0,0 +1,222 @@
+# Inference backends for the clothing descriptor pipeline
+# torch is imported where it's used, so the pipeline (and check_pipeline.py) runs without it
+import gc
+import os
+from abc import ABC, abstractmethod
+
+PROMPT_TEMPLATE = """[INST] <image>
+Analyze this clothing item and describe its key features including:
+- Type of clothing (shirt, dress, pants, etc.)
+- Color(s)
+- Pattern (solid, striped, floral, etc.)
+- Material/fabric texture if visible
+- Style details (sleeves, collar, fit, etc.)
+- Any notable design elements
+
+Provide a concise description focusing on the main clothing features. [/INST]"""
+
+LLAVA_MODEL_ID = "llava-hf/llava-v1.6-mistral-7b-hf"
+CPU_CAPTIONER_MODEL_ID = "Salesforce/blip-image-captioning-base"
+
+
+def check_gpu_status():
+    """Check GPU availability and memory"""
+    try:
+        import torch
+    except ImportError:
+        print("❌ PyTorch not installed")
+        return
+
+    if torch.cuda.is_available():
+        for i in range(torch.cuda.device_count()):
+            gpu_name = torch.cuda.get_device_name(i)
+            total_memory = torch.cuda.get_device_properties(i).total_memory / 1024**3
+            print(f"✅ GPU {i}: {gpu_name}")
+            print(f"   Total Memory: {total_memory:.2f} GB")
+
+        print(f"🔥 CUDA Version: {torch.version.cuda}")
+        print(f"⚡ PyTorch Version: {torch.__version__}")
+    else:
+        print("❌ No GPU available")
+
+
+class VisionBackend(ABC):
+    """
+    Interface the descriptor pipeline runs a model through.
+
+    `prepare()` is CPU-only work (image preprocessing, tokenization) and runs on
+    the pipeline's preprocessing threads; `generate()` runs the model on the
+    prepared batch and returns one description per image, in order. A backend
+    missing either one can't be instantiated.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def prepare(self, images):
+        """Preprocess a list of PIL images into model inputs"""
+
+    @abstractmethod
+    def generate(self, prepared):
+        """Descriptions for a prepared batch, one per image"""
+
+    def describe_one(self, image):
+        """Fallback for a single image when its batch fails"""
+        return self.generate(self.prepare([image]))[0]
+
+    def release_memory(self):
+        """Called between batches"""
+        gc.collect()
+
+
+class LlavaBackend(VisionBackend):
+    """LLaVA 1.6 (Mistral 7B) in fp16, tuned for a single A100 80GB"""
+
+    name = "llava"
+
+    def __init__(self, model_id=LLAVA_MODEL_ID, compile_model=True):
+        import torch
+        from transformers import LlavaNextProcessor, LlavaNextForConditionalGeneration
+
+        # Clear GPU memory first
+        torch.cuda.empty_cache()
+        gc.collect()
+
+        # Set optimal PyTorch settings for A100
+        torch.backends.cudnn.benchmark = True
+        torch.backends.cudnn.enabled = True
+
+        self.processor = LlavaNextProcessor.from_pretrained(model_id)
+
+        # For A100 80GB - use full precision and no quantization for maximum speed
+        self.model = LlavaNextForConditionalGeneration.from_pretrained(
+            model_id,
+            torch_dtype=torch.float16,  # Use fp16 for speed while maintaining quality
+            low_cpu_mem_usage=True,
+            device_map="auto",
+            # Remove quantization for A100 - we have enough VRAM
+            # load_in_4bit=False,  # Disabled for A100
+            trust_remote_code=True
+        )
+
+        # Enable model compilation for faster inference (PyTorch 2.0+)
+        if compile_model and hasattr(torch, 'compile'):
+            print("Compiling model for optimal A100 performance...")
+            self.model = torch.compile(self.model, mode="max-autotune")
+
+        print(f"Model loaded successfully!")
+        print(f"GPU Memory: {torch.cuda.memory_allocated()/1024**3:.2f} GB allocated")
+        print(f"GPU Memory Reserved: {torch.cuda.memory_reserved()/1024**3:.2f} GB")
+
+    def prepare(self, images):
+        return self.processor(text=[PROMPT_TEMPLATE] * len(images), images=images, return_tensors="pt", padding=True)
+
+    def generate(self, prepared):
+        import torch
+
+        # Move to GPU
+        if torch.cuda.is_available():
+            prepared = {k: v.to(self.model.device) for k, v in prepared.items() if isinstance(v, torch.Tensor)}
+
+        with torch.no_grad():
+            outputs = self.model.generate(
+                **prepared,
+                max_new_tokens=200,
+                do_sample=False,
+                temperature=0.1,
+                pad_token_id=self.processor.tokenizer.eos_token_id,
+                # Optimize for batch processing
+                use_cache=True,
+                num_beams=1  # Faster than beam search
+            )
+
+        descriptions = []
+        for output in outputs:
+            response = self.processor.decode(output, skip_special_tokens=True)
+            # Extract just the generated part
+            if "[/INST]" in response:
+                descriptions.append(response.split("[/INST]")[-1].strip())
+            else:
+                descriptions.append(response.strip())
+        return descriptions
+
+    def describe_one(self, image):
+        return self.generate(self.processor(text=PROMPT_TEMPLATE, images=image, return_tensors="pt"))[0]
+
+    def release_memory(self):
+        import torch
+
+        # Clear GPU cache
+        torch.cuda.empty_cache()
+        gc.collect()
+
+
+class CpuCaptionBackend(VisionBackend):
+    """
+    Small image captioner for machines without a GPU.
+
+    Linear layers are dynamically quantized to int8, which roughly halves
+    latency on CPU, and PyTorch's intra-op thread pool is sized to the machine.
+    Descriptions are shorter than LLaVA's but good enough for incremental
+    refreshes of a few hundred new products.
+    """
+
+    name = "cpu"
+
+    def __init__(self, model_id=CPU_CAPTIONER_MODEL_ID, quantize=True, num_threads=None,
+                 prompt="a photo of clothing:", max_new_tokens=60):
+        import torch
+        from transformers import BlipProcessor, BlipForConditionalGeneration
+
+        torch.set_num_threads(num_threads or os.cpu_count() or 1)
+        self.prompt = prompt
+        self.max_new_tokens = max_new_tokens
+        self.processor = BlipProcessor.from_pretrained(model_id)
+        # The decoded caption starts with the prompt as the tokenizer round-trips it
+        # (lowercased, punctuation split off: "a photo of clothing :")
+        tokenizer = self.processor.tokenizer
+        self.decoded_prompt = tokenizer.decode(tokenizer(prompt, add_special_tokens=False).input_ids,
+                                               skip_special_tokens=True).strip()
+        model = BlipForConditionalGeneration.from_pretrained(model_id).eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model
+        print(f"Captioner loaded on CPU ({'int8' if quantize else 'fp32'}, {torch.get_num_threads()} threads)")
+
+    def prepare(self, images):
+        return self.processor(images=images, text=[self.prompt] * len(images), return_tensors="pt", padding=True)
+
+    def generate(self, prepared):
+        import torch
+
+        with torch.inference_mode():
+            outputs = self.model.generate(**prepared, max_new_tokens=self.max_new_tokens, num_beams=1, do_sample=False)
+        captions = self.processor.batch_decode(outputs, skip_special_tokens=True)
+        return [self._strip_prompt(caption) for caption in captions]
+
+    def _strip_prompt(self, caption):
+        caption = caption.strip()
+        if caption.startswith(self.decoded_prompt):
+            caption = caption[len(self.decoded_prompt):]
+        return caption.strip()
+
+
+BACKENDS = {
+    LlavaBackend.name: LlavaBackend,
+    CpuCaptionBackend.name: CpuCaptionBackend,
+}
+
+def default_backend_name():
+    try:
+        import torch
+    except ImportError:
+        return CpuCaptionBackend.name
+    return LlavaBackend.name if torch.cuda.is_available() else CpuCaptionBackend.name
+
+def create_backend(name=None, **kwargs):
+    """Instantiate a backend by name ("llava" or "cpu"); defaults to LLaVA when a GPU is present"""
+    name = name or default_backend_name()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown vision backend '{name}' (choose from {', '.join(BACKENDS)})")
+    print(f"Setting up '{name}' vision backend...")
+    return BACKENDS[name](**kwargs)
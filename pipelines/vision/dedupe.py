@@ -0,0 +1,101 @@
+# Perceptual-hash deduplication of product images before running the vision model
+import threading
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8  # 64-bit hashes
+
+def dhash(image, hash_size=HASH_SIZE):
+    """Difference hash: one bit per horizontally adjacent pixel pair of a tiny grayscale thumbnail"""
+    small = image.convert("L").resize((hash_size + 1, hash_size), Image.LANCZOS)
+    pixels = np.asarray(small, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    return int("".join("1" if bit else "0" for bit in bits), 2)
+
+def mean_color(image, size=HASH_SIZE):
+    """Mean RGB of a tiny thumbnail; dHash is grayscale, so this tells colorways apart"""
+    small = image.convert("RGB").resize((size, size), Image.BILINEAR)
+    return tuple(int(c) for c in np.asarray(small, dtype=np.float32).reshape(-1, 3).mean(axis=0))
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+def color_distance(a, b):
+    return max(abs(x - y) for x, y in zip(a, b))
+
+class NearDuplicateIndex:
+    """
+    Groups near-identical images (e.g. the same photo reused across color/size variants).
+
+    Each new hash is compared against group representatives only. Candidates are
+    found through band tables: a 64-bit hash is split into `max_distance + 1` bands,
+    and two hashes within `max_distance` bits must agree on at least one band, so
+    lookups stay cheap as the catalog grows.
+
+    The same shot in another colorway has nearly the same grayscale hash, so an
+    image given with its `mean_color` only joins a group whose representative's
+    mean color is within `color_tolerance` on every channel.
+    """
+
+    def __init__(self, max_distance=4, hash_bits=HASH_SIZE * HASH_SIZE, color_tolerance=20):
+        self.max_distance = max_distance
+        self.color_tolerance = color_tolerance
+        self.bands = max_distance + 1
+        self.band_bits = -(-hash_bits // self.bands)
+        self._tables = {}
+        self._hashes = {}
+        self._colors = {}
+        self._members = {}
+        self._lock = threading.Lock()
+
+    def _band_keys(self, image_hash):
+        mask = (1 << self.band_bits) - 1
+        return [(i, (image_hash >> (i * self.band_bits)) & mask) for i in range(self.bands)]
+
+    def add(self, url, image_hash, color=None):
+        """Register an image; returns its group representative (the url itself if the image is new)"""
+        with self._lock:
+            if image_hash == 0:
+                # Flat images (blank placeholders, solid swatches) carry no structure to compare
+                self._members.setdefault(url, [url])
+                return url
+            keys = self._band_keys(image_hash)
+            for key in keys:
+                for representative in self._tables.get(key, ()):
+                    if hamming(image_hash, self._hashes[representative]) > self.max_distance:
+                        continue
+                    representative_color = self._colors.get(representative)
+                    if (color is not None and representative_color is not None and
+                            color_distance(color, representative_color) > self.color_tolerance):
+                        continue  # Same shot, different colorway
+                    self._members[representative].append(url)
+                    return representative
+
+            self._hashes[url] = image_hash
+            self._colors[url] = color
+            self._members[url] = [url]
+            for key in keys:
+                self._tables.setdefault(key, []).append(url)
+            return url
+
+    def members(self, representative):
+        with self._lock:
+            return list(self._members.get(representative, [representative]))
+
+    def groups(self):
+        """representative -> every url in its group"""
+        with self._lock:
+            return {representative: list(members) for representative, members in self._members.items()}
+
+    def expand(self, results):
+        """Fan each representative's result out to every member of its group"""
+        expanded = {}
+        for representative, value in results.items():
+            for url in self.members(representative):
+                expanded[url] = value
+        return expanded
+
+    def stats(self):
+        with self._lock:
+            images = sum(len(members) for members in self._members.values())
+            return {"images": images, "groups": len(self._members), "duplicates": images - len(self._members)}
@@ -0,0 +1,27 @@
+import os
+import sys
+
+# Ensure project root (which contains `src/`) is importable when running from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.utils.catalog import Catalog, compile_catalog
+from src.utils.vector_index import save_embeddings
+
+# Compile the catalog the app loads (path relative to project root)
+CSV_PATH = os.path.join(PROJECT_ROOT, "final_products_complete.csv")
+
+
+def main():
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else CSV_PATH
+    if not os.path.exists(csv_path):
+        print(f"Catalog CSV not found at {csv_path}. Run the vision pipeline first.")
+        sys.exit(1)
+    catalog_path = compile_catalog(csv_path)
+    # Precompute the recommendation embeddings against the same row ids
+    save_embeddings(Catalog.from_binary(catalog_path), csv_path)
+
+
+if __name__ == "__main__":
+    main()
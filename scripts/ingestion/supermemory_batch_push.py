@@ -1,8 +1,6 @@
 import os
 import sys
-import pandas as pd
-import requests
-from typing import List, Dict
+from typing import Any, List, Dict
 from pathlib import Path
 
 # Ensure project src/ is importable when running from scripts/
@@ -11,7 +9,9 @@ SRC_PATH = os.path.join(PROJECT_ROOT, "src")
 if SRC_PATH not in sys.path:
     sys.path.insert(0, SRC_PATH)
 
-from src.supermemory.client import SUPERMEMORY_API_URL, build_headers
+from src.supermemory.client import SUPERMEMORY_API_URL
+from src.supermemory.ingest import iter_csv_batches, run_ingestion
+from src.supermemory.manifest import CatalogManifest, closet_document, extract_document_ids
 
 # Optional: Load .env for scripts when present
 try:
@@ -22,67 +22,41 @@ try:
 except Exception:
     pass
 
-# Load dataset and drop rows with NaN values (path relative to project root)
+# Dataset path relative to project root; rows with NaN values are skipped while streaming
 CSV_PATH = os.path.join(PROJECT_ROOT, "final_products_complete.csv")
-df = pd.read_csv(CSV_PATH).dropna()
 
 API_URL = f"{SUPERMEMORY_API_URL}/documents/batch"
-headers = build_headers()
+CHECKPOINT_PATH = os.path.join(PROJECT_ROOT, ".closet_ingest.checkpoint")
+# Shared with supermemory_sync.py, which diffs later catalog changes against it
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, ".closet_manifest.sqlite")
+MAX_CONCURRENCY = 8
 
-def create_batch_payload(rows: List[pd.Series]) -> Dict:
-    """Create batch payload from DataFrame rows"""
-    documents = []
-    
-    for _, row in rows:
-        document = {
-            "containerTag": "closet",
-            "content": f"Product Description: {row['clothing_features']}",
-            "metadata": {
-                "name": row["name"],
-                "url": row["product_url"],
-                "image_url": row["image_url"],
-                "brand": row["source"],
-                "features": row["clothing_features"]
-            }
-        }
-        documents.append(document)
-    
-    return {"documents": documents}
+def create_batch_payload(rows: List[Any]) -> Dict:
+    """Create batch payload from CSV rows"""
+    return {"documents": [closet_document(row) for row in rows]}
 
-def upload_batch(batch_rows: List[pd.Series]) -> None:
-    """Upload a batch of products to SuperMemory"""
-    payload = create_batch_payload(batch_rows)
-    
-    try:
-        response = requests.post(API_URL, json=payload, headers=headers)
-        
-        if response.status_code == 200:
-            result = response.json()
-            print(f"✅ Batch uploaded successfully: {len(batch_rows)} products")
-            # Print individual results if available
-            if 'results' in result:
-                for i, item_result in enumerate(result['results']):
-                    product_name = batch_rows[i][1]['name']
-                    print(f"   - {product_name}: {item_result.get('status', 'unknown')}")
-        else:
-            print(f"❌ Batch upload failed: {response.status_code} | {response.text}")
-            
-    except Exception as e:
-        print(f"❌ Batch upload error: {str(e)}")
+def iter_batches(batch_size: int):
+    """Yield (batch_id, documents) pairs; ids are stable for a given CSV and batch size"""
+    return iter_csv_batches(CSV_PATH, closet_document, batch_size)
 
 def main():
-    # Process in batches of 50 (adjust batch size as needed)
+    # Up to MAX_CONCURRENCY batches of 100 in flight, adapting to observed latency
     batch_size = 100
-    total_rows = len(df)
     
-    print(f"Processing {total_rows} products in batches of {batch_size}...")
+    print(f"Streaming products from {CSV_PATH} in batches of {batch_size}...")
+    
+    # Record every uploaded product so supermemory_sync.py starts from what is stored
+    manifest = CatalogManifest(MANIFEST_PATH)
+    def on_batch_done(batch_id, documents, response_json):
+        manifest.record(documents, extract_document_ids(response_json, len(documents)))
     
-    for i in range(0, total_rows, batch_size):
-        batch_end = min(i + batch_size, total_rows)
-        batch_rows = list(df.iloc[i:batch_end].iterrows())
-        
-        print(f"\nUploading batch {i//batch_size + 1} (rows {i+1}-{batch_end})...")
-        upload_batch(batch_rows)
+    stat = os.stat(CSV_PATH)
+    fingerprint = f"{CSV_PATH}:{stat.st_size}:{int(stat.st_mtime)}:{batch_size}"
+    try:
+        run_ingestion(iter_batches(batch_size), checkpoint_path=CHECKPOINT_PATH, fingerprint=fingerprint,
+                      api_url=API_URL, max_concurrency=MAX_CONCURRENCY, on_batch_done=on_batch_done)
+    finally:
+        manifest.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
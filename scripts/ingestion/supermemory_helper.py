@@ -1,7 +1,6 @@
 import os
 import sys
 import pandas as pd
-import requests
 from pathlib import Path
 
 # Ensure project src/ is importable when running from scripts/
@@ -10,7 +9,7 @@ SRC_PATH = os.path.join(PROJECT_ROOT, "src")
 if SRC_PATH not in sys.path:
     sys.path.insert(0, SRC_PATH)
 
-from src.supermemory.client import build_headers, SUPERMEMORY_API_URL
+from src.supermemory.client import get_client, SUPERMEMORY_API_URL
 
 # Optional: Load .env for scripts when present (without impacting app)
 try:
@@ -26,7 +25,7 @@ CSV_PATH = os.path.join(PROJECT_ROOT, "final_products.csv")
 df = pd.read_csv(CSV_PATH).dropna()
 
 API_URL = f"{SUPERMEMORY_API_URL}/documents"
-headers = build_headers()
+client = get_client()
 
 for _, row in df.iterrows():
     payload = {
@@ -41,7 +40,7 @@ for _, row in df.iterrows():
         }
     }
 
-    response = requests.post(API_URL, headers=headers, json=payload)
+    response = client.post(API_URL, payload)
     if response.status_code == 200:
         print(f"✅ Stored: {row['name']} (ID: {response.json()['id']})")
     else:
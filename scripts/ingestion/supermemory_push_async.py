@@ -1,8 +1,6 @@
 import os
 import sys
-import pandas as pd
 import asyncio
-import aiohttp
 from pathlib import Path
 
 # Ensure project src/ is importable when running from scripts/
@@ -11,7 +9,9 @@ SRC_PATH = os.path.join(PROJECT_ROOT, "src")
 if SRC_PATH not in sys.path:
     sys.path.insert(0, SRC_PATH)
 
-from src.supermemory.client import build_headers, SUPERMEMORY_API_URL
+from src.supermemory.client import SUPERMEMORY_API_URL
+from src.supermemory.ingest import IngestEngine, iter_csv_batches
+from src.supermemory.manifest import closet_document
 
 # Optional: Load .env for scripts when present
 try:
@@ -22,41 +22,19 @@ try:
 except Exception:
     pass
 
-# Load dataset and drop rows with NaN values
+# Dataset is streamed in chunks; rows with NaN values are skipped
 CSV_PATH = os.path.join(PROJECT_ROOT, "final_products_complete.csv")
-df = pd.read_csv(CSV_PATH).dropna()
 
-API_URL = f"{SUPERMEMORY_API_URL}/documents"
-headers = build_headers()
-
-async def upload_product(session, row):
-    payload = {
-        "content": f"Product Description: {row['clothing_features']}",
-        "containerTag": "closet",
-        "metadata": {
-            "name": row["name"],
-            "url": row["product_url"],
-            "image_url": row["image_url"],
-            "brand": row["source"],
-            "features": row["clothing_features"]
-        }
-    }
-    
-    try:
-        async with session.post(API_URL, headers=headers, json=payload) as response:
-            if response.status == 200:
-                result = await response.json()
-                print(f"✅ Stored: {row['name']} (ID: {result['id']})")
-            else:
-                text = await response.text()
-                print(f"❌ Failed: {row['name']} | {response.status} | {text}")
-    except Exception as e:
-        print(f"❌ Error: {row['name']} | {str(e)}")
+API_URL = f"{SUPERMEMORY_API_URL}/documents/batch"
+BATCH_SIZE = 100
+MAX_CONCURRENCY = 8
 
 async def main():
-    async with aiohttp.ClientSession() as session:
-        tasks = [upload_product(session, row) for _, row in df.iterrows()]
-        await asyncio.gather(*tasks)
+    # Bounded, adaptive concurrency instead of one request per row all at once
+    batches = iter_csv_batches(CSV_PATH, closet_document, BATCH_SIZE)
+    engine = IngestEngine(api_url=API_URL, max_concurrency=MAX_CONCURRENCY)
+    stats = await engine.run(batches)
+    print(f"Uploaded {stats['documents']} products ({stats['failed']} batches failed)")
 
 # Run the async function
-asyncio.run(main())
\ No newline at end of file
+asyncio.run(main())
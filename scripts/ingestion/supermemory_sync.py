@@ -0,0 +1,119 @@
+import os
+import sys
+import argparse
+from pathlib import Path
+from typing import Iterable, List
+
+# Ensure project src/ is importable when running from scripts/
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+SRC_PATH = os.path.join(PROJECT_ROOT, "src")
+if SRC_PATH not in sys.path:
+    sys.path.insert(0, SRC_PATH)
+
+from src.supermemory.client import SUPERMEMORY_API_URL, get_client
+from src.supermemory.ingest import iter_csv_batches, run_ingestion
+from src.supermemory.manifest import CatalogManifest, closet_document, extract_document_ids, product_key
+
+# Optional: Load .env for scripts when present
+try:
+    from dotenv import load_dotenv
+    env_path = Path(PROJECT_ROOT) / ".env"
+    if env_path.exists():
+        load_dotenv(env_path, override=True)
+except Exception:
+    pass
+
+CSV_PATH = os.path.join(PROJECT_ROOT, "final_products_complete.csv")
+MANIFEST_PATH = os.path.join(PROJECT_ROOT, ".closet_manifest.sqlite")
+API_URL = f"{SUPERMEMORY_API_URL}/documents/batch"
+CONTAINER_TAG = "closet"
+BATCH_SIZE = 100
+MAX_CONCURRENCY = 8
+
+def iter_documents():
+    """Every document the closet container should hold, streamed from the catalog CSV"""
+    build_document = lambda row: closet_document(row, CONTAINER_TAG)
+    for _, documents in iter_csv_batches(CSV_PATH, build_document, BATCH_SIZE):
+        yield from documents
+
+def delete_documents(document_ids: Iterable[str]) -> list:
+    """Delete remote documents; returns the ids that are gone"""
+    client = get_client()
+    deleted = []
+    for document_id in document_ids:
+        try:
+            response = client.delete(f"{SUPERMEMORY_API_URL}/documents/{document_id}")
+            if response.status_code in (200, 204, 404):
+                deleted.append(document_id)
+            else:
+                print(f"❌ Failed to delete {document_id}: {response.status_code} | {response.text}")
+        except Exception as e:
+            print(f"❌ Failed to delete {document_id}: {str(e)}")
+    return deleted
+
+def warn_untracked(keys: List[str], action: str):
+    """Products whose old remote document has no id in the manifest and can't be deleted"""
+    if not keys:
+        return
+    print(f"⚠️ {len(keys)} {action} products have no document id in the manifest; "
+          f"their old documents stay in '{CONTAINER_TAG}' and need removing by hand:")
+    for key in keys[:10]:
+        print(f"   - {key.splitlines()[0]}")
+
+def bootstrap(manifest: CatalogManifest):
+    """Record the current catalog as already uploaded (container filled before the manifest existed)"""
+    documents = list(iter_documents())
+    for i in range(0, len(documents), BATCH_SIZE):
+        batch = documents[i:i + BATCH_SIZE]
+        manifest.record(batch, [None] * len(batch))
+    print(f"✅ Bootstrapped manifest with {len(documents)} products (without document ids)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Incrementally sync the catalog into the closet container")
+    parser.add_argument("--bootstrap", action="store_true",
+                        help="Record the current catalog as already uploaded instead of syncing")
+    args = parser.parse_args()
+    
+    manifest = CatalogManifest(MANIFEST_PATH)
+    if args.bootstrap:
+        bootstrap(manifest)
+        manifest.close()
+        return
+    if len(manifest) == 0:
+        # Syncing against an empty manifest would upload every product a second time
+        print(f"❌ Manifest {MANIFEST_PATH} is empty. Upload the catalog with supermemory_batch_push.py "
+              f"(which records it), or run with --bootstrap if '{CONTAINER_TAG}' was filled without a manifest.")
+        manifest.close()
+        sys.exit(1)
+    
+    print(f"Manifest: {len(manifest)} products uploaded")
+    to_upload, replaced, removed = manifest.plan(iter_documents())
+    
+    print(f"Sync plan: {len(to_upload) - len(replaced)} added, {len(replaced)} changed, {len(removed)} removed")
+    
+    # Record each uploaded batch as soon as it lands, so an interrupted sync resumes from the manifest.
+    # Recording queues the superseded document ids for deletion in the same transaction.
+    uploaded_keys = set()
+    untracked = []
+    def on_batch_done(batch_id, batch_documents, response_json):
+        untracked.extend(manifest.record(batch_documents, extract_document_ids(response_json, len(batch_documents))))
+        uploaded_keys.update(product_key(d) for d in batch_documents)
+    
+    if to_upload:
+        batches = ((i // BATCH_SIZE, to_upload[i:i + BATCH_SIZE]) for i in range(0, len(to_upload), BATCH_SIZE))
+        run_ingestion(batches, api_url=API_URL, max_concurrency=MAX_CONCURRENCY, on_batch_done=on_batch_done)
+    warn_untracked(untracked, "changed")
+    warn_untracked(manifest.retire(removed), "removed")
+    
+    # Old versions of changed products and removed products (including deletes left over
+    # from earlier syncs) stay pending in the manifest until the delete succeeds
+    pending = manifest.pending_deletes()
+    deleted = delete_documents(pending)
+    manifest.clear_pending(deleted)
+    
+    print(f"✅ Sync complete: {len(uploaded_keys)} uploaded, {len(deleted)} deleted, "
+          f"{len(pending) - len(deleted)} deletes pending")
+    manifest.close()
+
+if __name__ == "__main__":
+    main()
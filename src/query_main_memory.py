@@ -1,6 +1,8 @@
 import requests
 import json
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List, Tuple
+
+from src.supermemory.client import get_client, SUPERMEMORY_API_URL
 
 def query_memories_with_collective(collective_memory: str, limit: int = 10) -> Dict[str, Any]:
     """
@@ -13,7 +15,7 @@ def query_memories_with_collective(collective_memory: str, limit: int = 10) -> D
     Returns:
         Dict[str, Any]: Response from supermemory API
     """
-    url = "https://api.supermemory.ai/v3/search"
+    url = f"{SUPERMEMORY_API_URL}/search"
     
     payload = {
         "q": collective_memory,  # Use "q" instead of "query"
@@ -27,13 +29,8 @@ def query_memories_with_collective(collective_memory: str, limit: int = 10) -> D
         "rewriteQuery": False
     }
     
-    headers = {
-        "Authorization": f"Bearer {__import__('src.supermemory.client', fromlist=['get_api_key']).get_api_key()}",
-        "Content-Type": "application/json"
-    }
-    
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        response = get_client().post(url, payload)
         response.raise_for_status()  # Raise an exception for bad status codes
         return response.json()
     except requests.exceptions.RequestException as e:
@@ -125,6 +122,38 @@ def extract_recommended_products(query_response: Dict[str, Any]) -> List[Dict[st
     
     return products
 
+def extract_recommended_ids(query_response: Dict[str, Any],
+                            lookup: Callable[[str, str, str], Optional[int]]) -> Tuple[List[int], List[float]]:
+    """
+    Resolve search hits to catalog row ids instead of building a product dict per hit.
+    
+    Args:
+        query_response (Dict[str, Any]): Response from query_memories_with_collective
+        lookup: Maps (name, brand, url) to a catalog row id (e.g. Catalog.lookup_id)
+    
+    Returns:
+        Tuple[List[int], List[float]]: Unique row ids and their scores, in ranked order
+    """
+    row_ids, scores = [], []
+    seen_ids = set()
+    
+    for result in query_response.get('results', []):
+        metadata = result.get('metadata') or {}
+        row_id = lookup(metadata.get('name', ''), metadata.get('brand', ''), metadata.get('url', ''))
+        # Hits that aren't in the catalog (or repeat a product) are skipped
+        if row_id is None or row_id in seen_ids:
+            continue
+        seen_ids.add(row_id)
+        row_ids.append(row_id)
+        scores.append(float(result.get('score', 0) or 0))
+    
+    return row_ids, scores
+
+def query_recommended_ids(collective_memory: str, lookup: Callable[[str, str, str], Optional[int]],
+                          limit: int = 10) -> Tuple[List[int], List[float]]:
+    """Search the closet with collective memory and return matching catalog row ids and scores"""
+    return extract_recommended_ids(query_memories_with_collective(collective_memory, limit), lookup)
+
 def query_and_analyze_memories(collective_memory: str, limit: int = 10) -> Dict[str, Any]:
     """
     Query memories and return both raw response and extracted insights.
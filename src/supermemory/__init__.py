@@ -1,5 +1,8 @@
 from .client import (
     SUPERMEMORY_API_URL,
+    SUPERMEMORY_API_V4_URL,
+    SupermemoryClient,
+    get_client,
     get_api_key,
     build_headers,
     search,
@@ -10,6 +13,9 @@ from .client import (
 
 __all__ = [
     "SUPERMEMORY_API_URL",
+    "SUPERMEMORY_API_V4_URL",
+    "SupermemoryClient",
+    "get_client",
     "get_api_key",
     "build_headers",
     "search",
@@ -1,8 +1,12 @@
 import os
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, Any, Optional, List
 
 SUPERMEMORY_API_URL = "https://api.supermemory.ai/v3"
+SUPERMEMORY_API_V4_URL = "https://api.supermemory.ai/v4"
 
 
 def get_api_key(env_var_name: str = "SUPERMEMORY_API_KEY") -> str:
@@ -29,14 +33,95 @@ def build_headers(api_key: Optional[str] = None) -> Dict[str, str]:
     }
 
 
+class SupermemoryClient:
+    """
+    Long-lived SuperMemory client backed by a pooled keep-alive `requests.Session`.
+
+    Auth headers are built once, connections are reused across calls (and threads),
+    and transient search failures (429/502/503/504, dropped connections) are retried
+    with exponential backoff. Document writes are only retried when the server
+    cannot have processed them (connection errors and 429), so an accepted write
+    is never posted twice.
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        pool_size: int = 20,
+        max_retries: int = 3,
+        backoff_factor: float = 0.3,
+        timeout: float = 20,
+    ):
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(build_headers(api_key))
+
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429, 502, 503, 504),
+            allowed_methods=None,  # SuperMemory search and writes are all POSTs
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # /documents writes: no retries after the request may have reached the server
+        write_retry = Retry(
+            total=max_retries,
+            read=0,
+            backoff_factor=backoff_factor,
+            status_forcelist=(429,),
+            allowed_methods=None,
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        write_adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=write_retry)
+        self.session.mount(f"{SUPERMEMORY_API_URL}/documents", write_adapter)
+
+    def post(self, url: str, payload: Dict[str, Any], timeout: Optional[float] = None) -> requests.Response:
+        return self.session.post(url, json=payload, timeout=timeout or self.timeout)
+
+    def delete(self, url: str, timeout: Optional[float] = None) -> requests.Response:
+        return self.session.delete(url, timeout=timeout or self.timeout)
+
+    def search(self, query: str, limit: int = 5, document_threshold: float = 0.3,
+               timeout: Optional[float] = None) -> requests.Response:
+        payload: Dict[str, Any] = {
+            "q": query,
+            "limit": limit,
+            "documentThreshold": document_threshold,
+        }
+        return self.post(f"{SUPERMEMORY_API_URL}/search", payload, timeout=timeout)
+
+    def post_document(self, document_payload: Dict[str, Any], timeout: Optional[float] = None) -> requests.Response:
+        return self.post(f"{SUPERMEMORY_API_URL}/documents", document_payload, timeout=timeout)
+
+    def post_documents_batch(self, documents: List[Dict[str, Any]], timeout: Optional[float] = None) -> requests.Response:
+        return self.post(f"{SUPERMEMORY_API_URL}/documents/batch", {"documents": documents}, timeout=timeout)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: Optional[SupermemoryClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> SupermemoryClient:
+    """Return the process-wide SupermemoryClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = SupermemoryClient()
+    return _client
+
+
 def search(query: str, limit: int = 5, document_threshold: float = 0.3, timeout: int = 20) -> requests.Response:
-    url = f"{SUPERMEMORY_API_URL}/search"
-    payload: Dict[str, Any] = {
-        "q": query,
-        "limit": limit,
-        "documentThreshold": document_threshold,
-    }
-    return requests.post(url, json=payload, headers=build_headers(), timeout=timeout)
+    return get_client().search(query, limit=limit, document_threshold=document_threshold, timeout=timeout)
 
 
 def create_document_payload(product: Dict[str, Any], container_tag: str) -> Dict[str, Any]:
@@ -55,13 +140,10 @@ def create_document_payload(product: Dict[str, Any], container_tag: str) -> Dict
 
 
 def post_document(document_payload: Dict[str, Any], timeout: int = 30) -> requests.Response:
-    url = f"{SUPERMEMORY_API_URL}/documents"
-    return requests.post(url, json=document_payload, headers=build_headers(), timeout=timeout)
+    return get_client().post_document(document_payload, timeout=timeout)
 
 
 def post_documents_batch(documents: List[Dict[str, Any]], timeout: int = 60) -> requests.Response:
-    url = f"{SUPERMEMORY_API_URL}/documents/batch"
-    payload = {"documents": documents}
-    return requests.post(url, json=payload, headers=build_headers(), timeout=timeout)
+    return get_client().post_documents_batch(documents, timeout=timeout)
 
 
@@ -0,0 +1,266 @@
+import os
+import json
+import time
+import random
+import asyncio
+import aiohttp
+import pandas as pd
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set, Tuple
+
+from .client import SUPERMEMORY_API_URL, build_headers
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Columns of final_products_complete.csv that make up a closet document
+CLOSET_COLUMNS = ["name", "product_url", "image_url", "source", "clothing_features"]
+
+
+def iter_csv_batches(csv_path: str, build_document: Callable[[Any], Dict[str, Any]], batch_size: int = 100,
+                     columns: List[str] = CLOSET_COLUMNS, chunksize: int = 10_000):
+    """
+    Stream (batch_id, documents) pairs straight from a CSV without loading the whole file.
+
+    Rows with a missing value in any of `columns` are skipped. Batch ids count the
+    kept rows, so they are stable across runs over the same file and batch size.
+
+    Args:
+        csv_path: Catalog CSV
+        build_document: Turns one row (a namedtuple from `itertuples`) into a document
+        batch_size: Documents per batch
+        columns: Columns to parse; everything else in the file is skipped
+        chunksize: Rows parsed per chunk, which bounds memory use
+    """
+    batch_id = 0
+    documents: List[Dict[str, Any]] = []
+    for chunk in pd.read_csv(csv_path, usecols=columns, chunksize=chunksize):
+        for row in chunk.dropna().itertuples(index=False, name="Product"):
+            documents.append(build_document(row))
+            if len(documents) == batch_size:
+                yield batch_id, documents
+                batch_id += 1
+                documents = []
+    if documents:
+        yield batch_id, documents
+
+
+class AdaptiveLimiter:
+    """
+    Concurrency window that grows while requests are fast and halves under pressure (AIMD).
+
+    The window grows by roughly one slot per window's worth of fast successes and
+    is cut in half on throttling (429) or when latency exceeds `target_latency`.
+    """
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 16, target_latency: float = 2.0):
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_latency = target_latency
+        self.in_flight = 0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def on_success(self, latency: float) -> None:
+        if latency > self.target_latency:
+            self._decrease()
+        else:
+            self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+
+    def on_throttle(self) -> None:
+        self._decrease()
+
+    def _decrease(self) -> None:
+        self.limit = max(float(self.minimum), self.limit / 2)
+
+
+class Checkpoint:
+    """
+    Append-only record of completed batch ids so a crashed run resumes where it stopped.
+
+    The first line fingerprints the input (e.g. CSV size/mtime and batch size);
+    a checkpoint for different input is ignored and started over.
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.completed: Set[int] = set()
+        if self._matches():
+            self._load()
+            self._file = open(self.path, "a")
+        else:
+            self._file = open(self.path, "w")
+            self._file.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+            self._file.flush()
+
+    def _matches(self) -> bool:
+        try:
+            with open(self.path) as f:
+                return json.loads(f.readline()).get("fingerprint") == self.fingerprint
+        except (OSError, ValueError):
+            return False
+
+    def _load(self) -> None:
+        with open(self.path) as f:
+            f.readline()
+            for line in f:
+                line = line.strip()
+                if line.isdigit():
+                    self.completed.add(int(line))
+
+    def mark(self, batch_id: int) -> None:
+        self.completed.add(batch_id)
+        self._file.write(f"{batch_id}\n")
+        self._file.flush()
+
+    def close(self, finished: bool = False) -> None:
+        self._file.close()
+        if finished:
+            os.remove(self.path)
+
+
+class IngestEngine:
+    """
+    Upload document batches to SuperMemory with bounded, adaptive concurrency.
+
+    Up to `max_concurrency` `/documents/batch` requests run at once under an
+    `AdaptiveLimiter`. 429/5xx responses and network errors are retried with
+    jittered exponential backoff (honouring Retry-After), and completed batches
+    are recorded in an optional `Checkpoint`. `on_batch_done(batch_id, documents,
+    response_json)` is called for every uploaded batch.
+    """
+
+    def __init__(
+        self,
+        api_url: str = f"{SUPERMEMORY_API_URL}/documents/batch",
+        initial_concurrency: int = 4,
+        max_concurrency: int = 16,
+        target_latency: float = 5.0,
+        max_retries: int = 6,
+        base_backoff: float = 0.5,
+        max_backoff: float = 30.0,
+        timeout: float = 60,
+        checkpoint: Optional[Checkpoint] = None,
+        on_batch_done: Optional[Callable[[int, List[Dict[str, Any]], Any], None]] = None,
+    ):
+        self.api_url = api_url
+        self.limiter = AdaptiveLimiter(initial_concurrency, 1, max_concurrency, target_latency)
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.checkpoint = checkpoint
+        self.on_batch_done = on_batch_done
+        self.stats = {"batches": 0, "documents": 0, "skipped": 0, "failed": 0, "retries": 0}
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(self.max_backoff, float(retry_after))
+            except ValueError:
+                pass
+        # Full jitter keeps retrying workers from synchronizing
+        return random.uniform(0, min(self.max_backoff, self.base_backoff * (2 ** attempt)))
+
+    async def _upload(self, session: aiohttp.ClientSession, batch_id: int,
+                      documents: List[Dict[str, Any]]) -> Tuple[bool, Any]:
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            async with self.limiter:
+                started = time.monotonic()
+                try:
+                    async with session.post(self.api_url, json={"documents": documents}) as response:
+                        if response.status == 200:
+                            self.limiter.on_success(time.monotonic() - started)
+                            return True, await response.json(content_type=None)
+                        text = await response.text()
+                        error = f"{response.status} | {text[:200]}"
+                        if response.status not in RETRYABLE_STATUSES:
+                            break
+                        if response.status in (429, 503):
+                            self.limiter.on_throttle()
+                        retry_after = response.headers.get("Retry-After")
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = str(e) or type(e).__name__
+                    self.limiter.on_throttle()
+
+            if attempt < self.max_retries:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, retry_after))
+
+        print(f"❌ Batch {batch_id} failed ({len(documents)} products): {error}")
+        return False, None
+
+    async def _run_batch(self, session: aiohttp.ClientSession, batch_id: int, documents: List[Dict[str, Any]]) -> None:
+        uploaded, result = await self._upload(session, batch_id, documents)
+        if uploaded:
+            if self.on_batch_done is not None:
+                self.on_batch_done(batch_id, documents, result)
+            self.stats["batches"] += 1
+            self.stats["documents"] += len(documents)
+            if self.checkpoint is not None:
+                self.checkpoint.mark(batch_id)
+            print(f"✅ Batch {batch_id} uploaded: {len(documents)} products "
+                  f"(window {int(self.limiter.limit)}, in flight {self.limiter.in_flight})")
+        else:
+            self.stats["failed"] += 1
+
+    async def run(self, batches: Iterable[Tuple[int, List[Dict[str, Any]]]]) -> Dict[str, int]:
+        """
+        Upload every batch not already recorded in the checkpoint.
+
+        Args:
+            batches: (batch_id, documents) pairs; ids must be stable across runs for resuming
+
+        Returns:
+            dict: Upload statistics
+        """
+        done = self.checkpoint.completed if self.checkpoint is not None else set()
+        connector = aiohttp.TCPConnector(limit=self.limiter.maximum)
+        async with aiohttp.ClientSession(headers=build_headers(), timeout=self.timeout, connector=connector) as session:
+            pending: Set[asyncio.Task] = set()
+            for batch_id, documents in batches:
+                if batch_id in done:
+                    self.stats["skipped"] += 1
+                    continue
+                # Keep only a bounded number of batches materialized at once
+                while len(pending) >= self.limiter.maximum * 2:
+                    _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                pending.add(asyncio.create_task(self._run_batch(session, batch_id, documents)))
+            if pending:
+                await asyncio.wait(pending)
+        return self.stats
+
+
+def run_ingestion(batches: Iterable[Tuple[int, List[Dict[str, Any]]]], checkpoint_path: Optional[str] = None,
+                  fingerprint: str = "", **engine_kwargs) -> Dict[str, int]:
+    """Synchronous entry point: run an IngestEngine over `batches`, resuming from `checkpoint_path`"""
+    checkpoint = Checkpoint(checkpoint_path, fingerprint) if checkpoint_path else None
+    if checkpoint is not None and checkpoint.completed:
+        print(f"↩️  Resuming: {len(checkpoint.completed)} batches already uploaded")
+
+    engine = IngestEngine(checkpoint=checkpoint, **engine_kwargs)
+    started = time.monotonic()
+    completed = False
+    try:
+        stats = asyncio.run(engine.run(batches))
+        completed = stats["failed"] == 0
+    finally:
+        # Keep the checkpoint after a crash or failed batches so the next run resumes
+        if checkpoint is not None:
+            checkpoint.close(finished=completed)
+
+    elapsed = time.monotonic() - started
+    print(f"\n📦 Uploaded {stats['documents']} products in {stats['batches']} batches "
+          f"({stats['skipped']} skipped, {stats['failed']} failed, {stats['retries']} retries) in {elapsed:.1f}s")
+    return stats
@@ -0,0 +1,172 @@
+import json
+import hashlib
+import sqlite3
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+
+def product_key(document: Dict[str, Any]) -> str:
+    """Stable identity of a product document: its name and product URL"""
+    metadata = document.get("metadata", {})
+    return f"{metadata.get('name', '')}\n{metadata.get('url', '')}"
+
+
+def closet_document(row: Any, container_tag: str = "closet") -> Dict[str, Any]:
+    """
+    The closet document for a catalog CSV row (an `itertuples` namedtuple).
+
+    Every script that uploads the catalog builds documents here, so the content
+    hashes recorded in the manifest match what a later sync computes.
+    """
+    return {
+        "content": f"Product Description: {row.clothing_features}",
+        "containerTag": container_tag,
+        "metadata": {
+            "name": row.name,
+            "url": row.product_url,
+            "image_url": row.image_url,
+            "brand": row.source,
+            "features": row.clothing_features,
+        },
+    }
+
+
+def content_hash(document: Dict[str, Any]) -> str:
+    """SHA-256 of the canonical JSON payload; changes whenever anything we upload changes"""
+    canonical = json.dumps(document, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def extract_document_ids(response_json: Any, count: int) -> List[Optional[str]]:
+    """Pull per-document ids out of a /documents/batch response (None where absent)"""
+    results = response_json.get("results", []) if isinstance(response_json, dict) else response_json or []
+    ids: List[Optional[str]] = []
+    for i in range(count):
+        item = results[i] if i < len(results) and isinstance(results[i], dict) else {}
+        ids.append(item.get("id") or item.get("documentId"))
+    return ids
+
+
+class CatalogManifest:
+    """
+    Local SQLite record of what has been uploaded to a container.
+
+    Maps each product key (name + product URL) to the content hash of the
+    uploaded payload and the remote document id, so a sync only has to push
+    added/changed products and delete removed ones.
+
+    Document ids that were superseded by a new upload, or whose product was
+    removed, move to a `pending_deletes` table in the same transaction and stay
+    there until the remote delete succeeds, so an interrupted or failed delete
+    is retried by the next sync instead of leaving an orphaned document.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS products ("
+            " key TEXT PRIMARY KEY,"
+            " content_hash TEXT NOT NULL,"
+            " document_id TEXT"
+            ")"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS pending_deletes ("
+            " document_id TEXT PRIMARY KEY,"
+            " key TEXT NOT NULL"
+            ")"
+        )
+        self.conn.commit()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+
+    def entries(self) -> Dict[str, Tuple[str, Optional[str]]]:
+        """key -> (content_hash, document_id)"""
+        return {key: (h, doc_id) for key, h, doc_id in self.conn.execute(
+            "SELECT key, content_hash, document_id FROM products")}
+
+    def plan(self, documents: Iterable[Dict[str, Any]]):
+        """
+        Diff the current catalog against the manifest.
+
+        Args:
+            documents: Every document the container should hold
+
+        Returns:
+            tuple: (documents to upload, {key: old document id} to delete once replaced,
+                    {key: document id} of products that were removed)
+        """
+        known = self.entries()
+        to_upload = []
+        replaced: Dict[str, Optional[str]] = {}
+        seen = set()
+        for document in documents:
+            key = product_key(document)
+            if key in seen:
+                continue
+            seen.add(key)
+            previous = known.get(key)
+            if previous is None:
+                to_upload.append(document)
+            elif previous[0] != content_hash(document):
+                to_upload.append(document)
+                replaced[key] = previous[1]
+
+        removed = {key: doc_id for key, (_, doc_id) in known.items() if key not in seen}
+        return to_upload, replaced, removed
+
+    def record(self, documents: List[Dict[str, Any]], document_ids: List[Optional[str]]) -> List[str]:
+        """
+        Record uploaded documents, queueing the ids they supersede for deletion.
+
+        Returns:
+            list: Keys whose previous version had no document id, so it can't be deleted
+        """
+        untracked = []
+        with self.conn:
+            for document, doc_id in zip(documents, document_ids):
+                key = product_key(document)
+                previous = self.conn.execute("SELECT document_id FROM products WHERE key = ?", (key,)).fetchone()
+                if previous is not None:
+                    if previous[0] is None:
+                        untracked.append(key)
+                    elif previous[0] != doc_id:
+                        self.conn.execute("INSERT OR IGNORE INTO pending_deletes (document_id, key) VALUES (?, ?)",
+                                          (previous[0], key))
+                self.conn.execute("INSERT OR REPLACE INTO products (key, content_hash, document_id) VALUES (?, ?, ?)",
+                                  (key, content_hash(document), doc_id))
+        return untracked
+
+    def retire(self, keys: Iterable[str]) -> List[str]:
+        """
+        Drop removed products, queueing their document ids for deletion.
+
+        Returns:
+            list: Keys that had no document id, so their remote document can't be deleted
+        """
+        untracked = []
+        with self.conn:
+            for key in keys:
+                row = self.conn.execute("SELECT document_id FROM products WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    continue
+                if row[0] is None:
+                    untracked.append(key)
+                else:
+                    self.conn.execute("INSERT OR IGNORE INTO pending_deletes (document_id, key) VALUES (?, ?)",
+                                      (row[0], key))
+                self.conn.execute("DELETE FROM products WHERE key = ?", (key,))
+        return untracked
+
+    def pending_deletes(self) -> Dict[str, str]:
+        """document_id -> product key of remote documents still to delete"""
+        return dict(self.conn.execute("SELECT document_id, key FROM pending_deletes"))
+
+    def clear_pending(self, document_ids: Iterable[str]) -> None:
+        with self.conn:
+            self.conn.executemany("DELETE FROM pending_deletes WHERE document_id = ?",
+                                  [(doc_id,) for doc_id in document_ids])
+
+    def close(self) -> None:
+        self.conn.close()
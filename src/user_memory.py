@@ -1,14 +1,22 @@
-import os
 import requests
 import streamlit as st
-from typing import Dict, Any, Optional
+from typing import Dict, Any
 import uuid
 
 # Configuration is sourced via Streamlit secrets; no dotenv loading here
 
-from src.supermemory.client import build_headers, SUPERMEMORY_API_URL
+from src.supermemory.client import get_client
+from get_user_preference import record_saved_preferences
 
-API_URL = f"{SUPERMEMORY_API_URL}/documents"
+# Maximum documents per /documents/batch request
+BATCH_LIMIT = 100
+
+# How much each preference type moves a session's taste vector
+PREFERENCE_WEIGHTS = {
+    "liked": 1.0,
+    "super_liked": 2.0,
+    "disliked": -1.0,
+}
 
 def get_session_id() -> str:
     """
@@ -21,27 +29,22 @@ def get_session_id() -> str:
         st.session_state.session_id = str(uuid.uuid4())[:8]  # Short session ID
     return st.session_state.session_id
 
-def push_to_supermemory(product: Dict[str, Any], preference_type: str = "liked") -> bool:
+def build_preference_payload(product: Dict[str, Any], preference_type: str, session_id: str) -> Dict[str, Any]:
     """
-    Push a liked product's metadata to Supermemory API.
+    Build the /documents payload recording a swipe in the session's user container.
     
     Args:
         product: Dictionary containing product information
-        preference_type: Type of preference ("liked" or "super_liked")
+        preference_type: Type of preference ("liked", "super_liked" or "disliked")
+        session_id: Session whose `<session_id>_user` container receives the document
     
     Returns:
-        bool: True if successful, False otherwise
+        dict: Document payload
     """
-    headers = build_headers()
-    
-    # Create the payload with product metadata
     # Handle both 'image' and 'image_url' field names
     image_url = product.get("image") or product.get("image_url", "")
     
-    # Get session ID for container tag
-    session_id = get_session_id()
-    
-    payload = {
+    return {
         "content": f"Product Description: {product.get('clothing_features', 'No description available')}",
         "containerTag": f"{session_id}_user",
         "metadata": {
@@ -54,11 +57,27 @@ def push_to_supermemory(product: Dict[str, Any], preference_type: str = "liked")
             "user_action": f"user_{preference_type}_this_product"
         }
     }
+
+def push_to_supermemory(product: Dict[str, Any], preference_type: str = "liked") -> bool:
+    """
+    Push a liked product's metadata to Supermemory API.
+    
+    Args:
+        product: Dictionary containing product information
+        preference_type: Type of preference ("liked" or "super_liked")
+    
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    session_id = get_session_id()
+    payload = build_preference_payload(product, preference_type, session_id)
     
     try:
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=10)
+        response = get_client().post_document(payload, timeout=10)
         
         if response.status_code == 200:
+            # New write version: the next preference lookup merges this swipe in
+            record_saved_preferences(session_id, [payload])
             return True
         else:
             st.error(f"Failed to save to memory: {response.status_code} - {response.text}")
@@ -131,28 +150,33 @@ def batch_save_preferences(liked_products: list, super_liked_products: list, dis
         "disliked_failed": 0
     }
     
-    # Save liked products
-    for product in liked_products:
-        if save_liked_product(product):
-            results["liked_saved"] += 1
-        else:
-            results["liked_failed"] += 1
-
-    
-    # Save super-liked products
-    for product in super_liked_products:
-        if save_super_liked_product(product):
-            results["super_liked_saved"] += 1
-        else:
-            results["super_liked_failed"] += 1
+    # Send every preference as one /documents/batch request per chunk
+    session_id = get_session_id()
+    documents = []
+    preference_types = []
+    for preference_type, products in (("liked", liked_products),
+                                      ("super_liked", super_liked_products),
+                                      ("disliked", disliked_products)):
+        for product in products:
+            documents.append(build_preference_payload(product, preference_type, session_id))
+            preference_types.append(preference_type)
 
-    # Save disliked products
-    for product in disliked_products:
-        if save_disliked_product(product):
-            results["disliked_saved"] += 1
-        else:
-            results["disliked_failed"] += 1
+    for start in range(0, len(documents), BATCH_LIMIT):
+        chunk = documents[start:start + BATCH_LIMIT]
+        try:
+            response = get_client().post_documents_batch(chunk, timeout=30)
+            success = response.status_code == 200
+            if success:
+                record_saved_preferences(session_id, chunk)
+            else:
+                st.error(f"Failed to save batch to memory: {response.status_code} - {response.text}")
+        except requests.exceptions.RequestException as e:
+            st.error(f"Network error saving batch to memory: {str(e)}")
+            success = False
 
+        outcome = "saved" if success else "failed"
+        for preference_type in preference_types[start:start + BATCH_LIMIT]:
+            results[f"{preference_type}_{outcome}"] += 1
     
     return results
 
@@ -0,0 +1,267 @@
+import os
+import json
+import mmap
+import random
+import struct
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from typing import Dict, Any, List, Optional, Tuple
+
+CATALOG_COLUMNS = ("name", "product_url", "image_url", "source", "clothing_features")
+
+# Binary layout: magic, header length, JSON header, then 8-byte aligned sections
+# (string offsets, string bytes, one uint32 string-id array per column).
+CATALOG_MAGIC = b"SLAPPCAT"
+CATALOG_VERSION = 1
+_PREAMBLE = struct.Struct("<8sII")
+
+
+def find_catalog_csv() -> str:
+    """Locate final_products_complete.csv (app data dir, app root, then project root)"""
+    app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+    project_root = os.path.abspath(os.path.join(app_root, '..'))
+    candidates = [
+        os.path.join(app_root, 'data', 'final_products_complete.csv'),
+        os.path.join(app_root, 'final_products_complete.csv'),
+        os.path.join(project_root, 'final_products_complete.csv'),
+    ]
+    for csv_path in candidates:
+        if os.path.exists(csv_path):
+            return csv_path
+    return candidates[-1]
+
+
+def binary_path_for(csv_path: str) -> str:
+    """Path of the compiled catalog that sits next to a CSV"""
+    return os.path.splitext(csv_path)[0] + ".catalog"
+
+
+def _align(offset: int, alignment: int = 8) -> int:
+    return (offset + alignment - 1) // alignment * alignment
+
+
+def compile_catalog(csv_path: str, output_path: str = None) -> str:
+    """
+    Compile the product CSV into the binary columnar catalog format.
+
+    Every distinct string is stored once in a shared string table; each column
+    is an array of uint32 ids into that table.
+
+    Args:
+        csv_path: Source CSV (same cleaning as the app: rows with NaN are dropped)
+        output_path: Destination file, defaults to the CSV path with a .catalog suffix
+
+    Returns:
+        str: Path of the written catalog
+    """
+    if output_path is None:
+        output_path = binary_path_for(csv_path)
+
+    df = pd.read_csv(csv_path).dropna()
+    columns = [c for c in CATALOG_COLUMNS if c in df.columns]
+
+    string_ids: Dict[str, int] = {}
+    encoded: List[bytes] = []
+    column_ids = {}
+    for name in columns:
+        ids = np.empty(len(df), dtype="<u4")
+        for i, value in enumerate(df[name].astype(str).to_numpy()):
+            sid = string_ids.get(value)
+            if sid is None:
+                sid = string_ids[value] = len(encoded)
+                encoded.append(value.encode("utf-8"))
+            ids[i] = sid
+        column_ids[name] = ids
+
+    string_offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+    np.cumsum([len(b) for b in encoded], out=string_offsets[1:])
+    string_data = b"".join(encoded)
+
+    # Lay out sections after a header whose size is only known once offsets are; iterate to a fixpoint
+    header_len = 0
+    while True:
+        cursor = _align(_PREAMBLE.size + header_len)
+        sections = {"string_offsets": cursor}
+        cursor = _align(cursor + string_offsets.nbytes)
+        sections["string_data"] = cursor
+        cursor = _align(cursor + len(string_data))
+        column_sections = {}
+        for name in columns:
+            column_sections[name] = cursor
+            cursor = _align(cursor + column_ids[name].nbytes)
+        header = json.dumps({
+            "rows": len(df),
+            "strings": len(encoded),
+            "string_offsets": sections["string_offsets"],
+            "string_data": sections["string_data"],
+            "columns": column_sections,
+        }).encode("utf-8")
+        if len(header) == header_len:
+            break
+        header_len = len(header)
+
+    blobs = [(sections["string_offsets"], string_offsets.tobytes()), (sections["string_data"], string_data)]
+    blobs += [(column_sections[name], column_ids[name].tobytes()) for name in columns]
+
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_PREAMBLE.pack(CATALOG_MAGIC, CATALOG_VERSION, header_len))
+        f.write(header)
+        for offset, blob in blobs:
+            f.write(b"\0" * (offset - f.tell()))
+            f.write(blob)
+    os.replace(tmp_path, output_path)
+
+    print(f"📦 Compiled {len(df)} products ({len(encoded)} unique strings) into {output_path}")
+    return output_path
+
+
+class MappedColumn:
+    """Read-only string column decoded lazily from a memory-mapped catalog"""
+
+    def __init__(self, ids: np.ndarray, string_offsets: np.ndarray, string_data: memoryview):
+        self._ids = ids
+        self._offsets = string_offsets
+        self._data = string_data
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, row_id: int) -> str:
+        sid = self._ids[row_id]
+        return str(self._data[self._offsets[sid]:self._offsets[sid + 1]], "utf-8")
+
+
+class Catalog:
+    """
+    Immutable, column-oriented product catalog shared by every session in the process.
+
+    Each column is a read-only NumPy array (or a memory-mapped string column)
+    indexed by row id, so sessions only need to keep row ids around instead of
+    their own copy of the products.
+    """
+
+    def __init__(self, columns: Dict[str, Any]):
+        for values in columns.values():
+            if isinstance(values, np.ndarray):
+                values.setflags(write=False)
+        self._columns = columns
+        self._size = len(next(iter(columns.values()))) if columns else 0
+        # Built on the first lookup_id() call: decoding every key out of the mmap
+        # would give each worker private copies of strings it rarely needs
+        self._key_index: Optional[Dict[Tuple[str, str, str], int]] = None
+        self._key_index_lock = threading.Lock()
+
+    def _build_key_index(self) -> Dict[Tuple[str, str, str], int]:
+        """(name, brand, product URL) -> row id, matching the metadata of uploaded closet documents"""
+        if not all(c in self._columns for c in ("name", "source", "product_url")):
+            return {}
+        names, brands, urls = self._columns["name"], self._columns["source"], self._columns["product_url"]
+        index = {}
+        for row_id in range(self._size):
+            index.setdefault((names[row_id], brands[row_id], urls[row_id]), row_id)
+        return index
+
+    def lookup_id(self, name: str, brand: str, url: str) -> Optional[int]:
+        """Row id of the product with this name, brand and URL, or None if it isn't in the catalog"""
+        if self._key_index is None:
+            with self._key_index_lock:
+                if self._key_index is None:
+                    self._key_index = self._build_key_index()
+        return self._key_index.get((name, brand, url))
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def column_names(self):
+        return tuple(self._columns)
+
+    def column(self, name: str):
+        return self._columns[name]
+
+    def row(self, row_id: int) -> Dict[str, Any]:
+        """
+        Materialize a single product as a dict.
+
+        Args:
+            row_id: Position of the product in the catalog
+
+        Returns:
+            dict: Product fields keyed by column name, plus its 'row_id'
+        """
+        product = {name: values[row_id] for name, values in self._columns.items()}
+        product['row_id'] = int(row_id)
+        return product
+
+    def sample_ids(self, k: int, exclude=None) -> List[int]:
+        """
+        Draw up to k distinct row ids uniformly at random in O(k).
+
+        Args:
+            k: Number of row ids
+            exclude: Optional container of row ids to skip (e.g. a session's SeenSet)
+        """
+        if not exclude:
+            return random.sample(range(self._size), min(k, self._size))
+
+        # Rejection sampling stays O(k) while most of the catalog is still unseen
+        k = min(k, self._size - len(exclude))
+        chosen = set()
+        row_ids = []
+        while len(row_ids) < k:
+            row_id = random.randrange(self._size)
+            if row_id not in exclude and row_id not in chosen:
+                chosen.add(row_id)
+                row_ids.append(row_id)
+        return row_ids
+
+    def shuffled_order(self) -> np.ndarray:
+        """Return a random permutation of row ids as a compact uint32 array"""
+        return np.random.permutation(self._size).astype(np.uint32)
+
+    @classmethod
+    def from_csv(cls, csv_path: str) -> "Catalog":
+        df = pd.read_csv(csv_path).dropna()
+        columns = [c for c in CATALOG_COLUMNS if c in df.columns]
+        return cls({c: df[c].astype(str).to_numpy(dtype=object) for c in columns})
+
+    @classmethod
+    def from_binary(cls, path: str) -> "Catalog":
+        """Memory-map a compiled catalog; pages are shared between worker processes"""
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, header_len = _PREAMBLE.unpack_from(mm, 0)
+        if magic != CATALOG_MAGIC or version != CATALOG_VERSION:
+            raise ValueError(f"Unsupported catalog file: {path}")
+        header = json.loads(mm[_PREAMBLE.size:_PREAMBLE.size + header_len])
+
+        rows = header["rows"]
+        string_offsets = np.frombuffer(mm, dtype="<u4", count=header["strings"] + 1,
+                                       offset=header["string_offsets"])
+        data_start = header["string_data"]
+        string_data = memoryview(mm)[data_start:data_start + int(string_offsets[-1])]
+        columns = {
+            name: MappedColumn(np.frombuffer(mm, dtype="<u4", count=rows, offset=offset),
+                               string_offsets, string_data)
+            for name, offset in header["columns"].items()
+        }
+        return cls(columns)
+
+
+@st.cache_resource
+def load_catalog() -> Catalog:
+    """Load the product catalog once per process and share it across sessions"""
+    csv_path = find_catalog_csv()
+    binary_path = binary_path_for(csv_path)
+    if os.path.exists(binary_path) and (
+            not os.path.exists(csv_path) or os.path.getmtime(binary_path) >= os.path.getmtime(csv_path)):
+        catalog = Catalog.from_binary(binary_path)
+        print(f"📊 Mapped {len(catalog)} products from {binary_path}")
+    else:
+        catalog = Catalog.from_csv(csv_path)
+        print(f"📊 Loaded {len(catalog)} products into shared catalog (run scripts/build_catalog.py to skip CSV parsing)")
+    return catalog
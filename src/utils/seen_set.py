@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class SeenSet:
+    """
+    Compact per-session set of catalog row ids, stored as a bitset.
+
+    Membership tests and inserts are O(1) and the whole set is one bit per
+    catalog product (under 1 KB for the current catalog), so every
+    recommendation source can check it before storing or rendering a product.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._bits = np.zeros((size + 7) // 8, dtype=np.uint8)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, row_id) -> bool:
+        if row_id is None or not 0 <= row_id < self.size:
+            return False
+        return bool(self._bits[row_id >> 3] & (1 << (row_id & 7)))
+
+    def add(self, row_id) -> bool:
+        """Mark a row id as seen; returns False if it already was (or isn't a catalog row)"""
+        if row_id is None or not 0 <= row_id < self.size or row_id in self:
+            return False
+        self._bits[row_id >> 3] |= 1 << (row_id & 7)
+        self._count += 1
+        return True
+
+    def mask(self) -> np.ndarray:
+        """Boolean mask over all row ids, e.g. for `VectorIndex.search(exclude=...)`"""
+        return np.unpackbits(self._bits, bitorder="little")[:self.size].astype(bool)
+
+    def copy(self) -> "SeenSet":
+        other = SeenSet.__new__(SeenSet)
+        other.size = self.size
+        other._bits = self._bits.copy()
+        other._count = self._count
+        return other
@@ -9,16 +9,19 @@ if PROJECT_ROOT not in sys.path:
     sys.path.insert(0, PROJECT_ROOT)
 
 # Environment configuration is read from Streamlit secrets; no dotenv loading
-import pandas as pd
-import requests
-from io import BytesIO
-from PIL import Image
 import uuid
 import time
-from user_memory import save_liked_product, save_super_liked_product, save_disliked_product
+import numpy as np
+from swipe_writer import get_swipe_writer
+from user_memory import PREFERENCE_WEIGHTS
+from build_executor import get_build_executor
 from get_user_preference import get_user_preferences
-from query_main_memory import query_and_analyze_memories
-from utils.data_loader import get_random_products
+from query_main_memory import query_recommended_ids
+from utils.data_loader import get_random_product_ids
+from utils.catalog import load_catalog
+from utils.seen_set import SeenSet
+from utils.vector_index import load_vector_index
+from utils.image_cache import get_image_cache
 
 # Page config
 # add lightning bolt icon
@@ -33,6 +36,13 @@ except Exception:
     pass
 
 
+# Empty (row ids, scores) result; arrays are never modified in place
+NO_RECOMMENDATIONS = (np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32))
+
+REFRESH_SIZE = 20  # Recommendations added per refresh
+OVERFETCH_LIMIT = 100  # Remote searches fetch this many candidates once and buffer the rest
+BUILD_RETRY_SWIPES = 5  # Swipes to wait before retrying a build that came back empty
+
 def initialize_session_state():
     """Initialize session state variables"""
     if 'current_index' not in st.session_state:
@@ -47,8 +57,15 @@ def initialize_session_state():
     if 'ai_mode' not in st.session_state:
         st.session_state.ai_mode = False
     
-    if 'ai_recommendations' not in st.session_state:
-        st.session_state.ai_recommendations = []
+    # AI recommendations are catalog row ids plus their scores
+    if 'ai_recommendation_ids' not in st.session_state:
+        st.session_state.ai_recommendation_ids = NO_RECOMMENDATIONS[0]
+        st.session_state.ai_recommendation_scores = NO_RECOMMENDATIONS[1]
+    
+    # Ranked remote candidates not yet moved into ai_recommendation_ids
+    if 'candidate_ids' not in st.session_state:
+        st.session_state.candidate_ids = NO_RECOMMENDATIONS[0]
+        st.session_state.candidate_scores = NO_RECOMMENDATIONS[1]
     
     if 'ai_index' not in st.session_state:
         st.session_state.ai_index = 0
@@ -62,50 +79,104 @@ def initialize_session_state():
     if 'pending_builds' not in st.session_state:
         st.session_state.pending_builds = set()  # Track which swipe numbers need AI building
     
+    if 'ai_build_future' not in st.session_state:
+        st.session_state.ai_build_future = None  # In-flight background build for this session
+    
+    if 'last_build_swipe' not in st.session_state:
+        st.session_state.last_build_swipe = None  # Swipe at which the last build was submitted
+    
     if 'last_saved_swipe' not in st.session_state:
-        st.session_state.last_saved_swipe = 0  # Prevent duplicate saves
+        st.session_state.last_saved_swipe = -1  # Prevent duplicate saves (no swipe saved yet)
     
     if 'random_fallback_mode' not in st.session_state:
         st.session_state.random_fallback_mode = False
     
     if 'random_products' not in st.session_state:
-        st.session_state.random_products = []
+        st.session_state.random_products = []  # Catalog row ids sampled for random fallback
     
     if 'random_index' not in st.session_state:
         st.session_state.random_index = 0
     
-    # Load CSV data once
-    if 'products_df' not in st.session_state:
-        csv_path = os.path.join(PROJECT_ROOT, 'final_products_complete.csv')
-        st.session_state.products_df = pd.read_csv(csv_path).dropna()
-        # Shuffle the dataframe to show random products each session
-        st.session_state.products_df = st.session_state.products_df.sample(frac=1).reset_index(drop=True)
-        print(f"📊 Loaded and shuffled {len(st.session_state.products_df)} products from CSV")
+    if 'taste_vector' not in st.session_state:
+        st.session_state.taste_vector = None  # Running sum of swiped product vectors, created on first swipe
+    
+    # Each session only keeps a shuffled order of row ids into the shared catalog
+    if 'product_order' not in st.session_state:
+        st.session_state.product_order = load_catalog().shuffled_order()
+        print(f"📊 Shuffled {len(st.session_state.product_order)} catalog rows for session")
+    
+    if 'seen_products' not in st.session_state:
+        st.session_state.seen_products = SeenSet(len(load_catalog()))  # Catalog rows this session has swiped
+
+SWIPE_PREFERENCE_TYPES = {
+    'like': 'liked',
+    'super_like': 'super_liked',
+    'dislike': 'disliked',
+}
+
+def get_vector_index():
+    """Shared vector index, or None when it can't be built (remote search is used instead)"""
+    try:
+        return load_vector_index()
+    except Exception as e:
+        print(f"⚠️ Local vector index unavailable, using remote search: {e}")
+        return None
+
+def update_taste_vector(action, product):
+    """Fold a swipe into the session's taste vector in O(d)"""
+    weight = PREFERENCE_WEIGHTS.get(SWIPE_PREFERENCE_TYPES.get(action))
+    index = get_vector_index()
+    if weight is None or index is None:
+        return
+    
+    if st.session_state.taste_vector is None:
+        st.session_state.taste_vector = np.zeros(index.matrix.shape[1], dtype=np.float32)
+    st.session_state.taste_vector += weight * index.product_vector(product)
 
 def save_swipe_immediately(action, product):
-    """Save each swipe immediately to Supermemory"""
+    """Queue each swipe for background persistence to Supermemory"""
     try:
         session_id = st.session_state.session_id
+        preference_type = SWIPE_PREFERENCE_TYPES.get(action)
+        if preference_type is None:
+            return
         
-        if action == 'like':
-            save_liked_product(product)
-            print(f"✅ Immediately saved LIKE: {product.get('name', 'Unknown')}")
-        elif action == 'super_like':
-            save_super_liked_product(product)
-            print(f"⭐ Immediately saved SUPER LIKE: {product.get('name', 'Unknown')}")
-        elif action == 'dislike':
-            save_disliked_product(product)
-            print(f"👎 Immediately saved DISLIKE: {product.get('name', 'Unknown')}")
+        writer = get_swipe_writer()
+        if writer.submit(session_id, product, preference_type):
+            print(f"📨 Queued {action.upper()}: {product.get('name', 'Unknown')}")
+        else:
+            print(f"⚠️ Swipe queue full, dropped {action}: {product.get('name', 'Unknown')} ({writer.metrics()})")
             
     except Exception as e:
         print(f"❌ Failed to save {action}: {e}")
 
-def get_ai_recommendations():
-    """Query collective memory and get AI recommendations"""
+def local_recommendations(index, query_vector, limit=REFRESH_SIZE, exclude=None):
+    """Top-k catalog row ids and scores for a query vector from the in-process index, skipping excluded rows"""
+    return index.search(query_vector, limit, exclude=exclude)
+
+def get_ai_recommendations(session_id, writer, catalog, index, taste_vector=None, exclude=None):
+    """
+    Query collective memory and get AI recommendations (safe to run off the script thread).
+
+    Args:
+        exclude: Boolean mask of catalog rows the session already has (swiped, queued or buffered)
+
+    Returns:
+        tuple: (catalog row ids, scores), best first; remote searches over-fetch OVERFETCH_LIMIT
+    """
     try:
-        session_id = st.session_state.session_id
+        # A taste vector built from this session's swipes is a single top-k, no round trips
+        if index is not None and taste_vector is not None and np.any(taste_vector):
+            recommendations = local_recommendations(index, taste_vector, exclude=exclude)
+            print(f"✅ Got {len(recommendations[0])} AI recommendations from taste vector")
+            return recommendations
+        
         print(f"🔍 Querying memory for session: {session_id}")
         
+        # Make sure buffered swipes reach SuperMemory before asking about them
+        if not writer.flush_session(session_id, timeout=5):
+            print(f"⚠️ Swipe flush timed out, querying with what's stored so far")
+        
         # Get user's saved preferences from memory
         preferences_response = get_user_preferences(session_id)
         
@@ -122,148 +193,256 @@ def get_ai_recommendations():
             print(f"🧠 Collective memory: {len(collective_memory)} chars")
             
             if collective_memory.strip():
-                # Query AI for recommendations based on memory
+                if index is not None:
+                    # Rank the catalog locally against the user's memory
+                    recommendations = local_recommendations(index, index.embed(collective_memory), exclude=exclude)
+                    print(f"✅ Got {len(recommendations[0])} AI recommendations from local index")
+                    return recommendations
+                
+                # Query AI for recommendations based on memory; hits resolve to catalog row ids.
+                # One over-fetched search fills the session's candidate buffer for later refreshes.
                 print(f"🤖 Querying AI for recommendations...")
-                memory_query_result = query_and_analyze_memories(collective_memory, limit=20)
-                recommendations = memory_query_result.get('recommended_products', [])
+                row_ids, scores = query_recommended_ids(collective_memory, catalog.lookup_id, limit=OVERFETCH_LIMIT)
+                row_ids = np.asarray(row_ids, dtype=np.int32)
+                scores = np.asarray(scores, dtype=np.float32)
+                if exclude is not None and len(row_ids):
+                    keep = ~exclude[row_ids]
+                    row_ids, scores = row_ids[keep], scores[keep]
                 
-                print(f"✅ Got {len(recommendations)} AI recommendations")
-                return recommendations
+                print(f"✅ Got {len(row_ids)} AI recommendations")
+                return row_ids, scores
             else:
                 print(f"⚠️ Empty collective memory")
-                return []
+                return NO_RECOMMENDATIONS
         else:
             print(f"❌ No memory found")
-            return []
+            return NO_RECOMMENDATIONS
             
     except Exception as e:
         print(f"💥 Failed to get AI recommendations: {e}")
-        return []
+        return NO_RECOMMENDATIONS
+
+def known_products_mask():
+    """Catalog rows the session already has: swiped, queued for display or buffered"""
+    mask = st.session_state.seen_products.mask()
+    mask[st.session_state.ai_recommendation_ids] = True
+    mask[st.session_state.candidate_ids] = True
+    return mask
+
+def add_ai_recommendations(new_recommendations, limit=REFRESH_SIZE):
+    """
+    Add ranked recommendations to the session pool, skipping duplicates and products already swiped.
+
+    The first `limit` new candidates are queued for display; the rest (e.g. from an
+    over-fetched remote search) go to the candidate buffer for later refreshes.
+    """
+    row_ids, scores = new_recommendations
+    row_ids = np.asarray(row_ids, dtype=np.int32)
+    scores = np.asarray(scores, dtype=np.float32)
+    
+    # Add to existing recommendations (don't replace), dropping rows the session already has
+    if len(row_ids):
+        keep = ~known_products_mask()[row_ids]
+        row_ids, scores = row_ids[keep], scores[keep]
+    if len(row_ids) == 0:
+        print(f"⚠️ No new recommendations found")
+        return False
+    
+    st.session_state.ai_recommendation_ids = np.concatenate([st.session_state.ai_recommendation_ids, row_ids[:limit]])
+    st.session_state.ai_recommendation_scores = np.concatenate([st.session_state.ai_recommendation_scores, scores[:limit]])
+    st.session_state.candidate_ids = np.concatenate([st.session_state.candidate_ids, row_ids[limit:]])
+    st.session_state.candidate_scores = np.concatenate([st.session_state.candidate_scores, scores[limit:]])
+    
+    st.session_state.recommendations_ready = True
+    
+    print(f"🎯 Added recommendations. Total unique: {len(st.session_state.ai_recommendation_ids)} "
+          f"({len(st.session_state.candidate_ids)} buffered)")
+    return True
+
+def consume_candidate_buffer(limit=REFRESH_SIZE):
+    """Refresh from buffered remote candidates instead of searching again; False if the buffer is empty"""
+    row_ids = st.session_state.candidate_ids
+    scores = st.session_state.candidate_scores
+    keep = ~st.session_state.seen_products.mask()[row_ids]
+    row_ids, scores = row_ids[keep], scores[keep]
+    if len(row_ids) == 0:
+        st.session_state.candidate_ids, st.session_state.candidate_scores = NO_RECOMMENDATIONS
+        return False
+    
+    st.session_state.candidate_ids, st.session_state.candidate_scores = row_ids[limit:], scores[limit:]
+    return add_ai_recommendations((row_ids[:limit], scores[:limit]), limit)
+
+def recommended_product(position):
+    """Materialize the AI recommendation at a position in the session's id array"""
+    product = load_catalog().row(int(st.session_state.ai_recommendation_ids[position]))
+    product['score'] = float(st.session_state.ai_recommendation_scores[position])
+    return product
+
+def start_ai_build(build_swipe):
+    """Start a background AI build for this session unless one is already running"""
+    future = st.session_state.ai_build_future
+    if future is not None and not future.done():
+        # Coalesce: run one more build once the current one lands
+        st.session_state.pending_builds.add(build_swipe)
+        return False
+    
+    # Remote candidates left over from an earlier over-fetched search are used first
+    if consume_candidate_buffer():
+        print(f"📦 Refreshed AI recommendations from candidate buffer at swipe {build_swipe}")
+        if (st.session_state.random_fallback_mode and
+            st.session_state.ai_index < len(st.session_state.ai_recommendation_ids)):
+            st.session_state.random_fallback_mode = False
+        return False
+    
+    taste_vector = st.session_state.taste_vector
+    print(f"🔄 Background: Building AI recommendations at swipe {build_swipe}...")
+    st.session_state.last_build_swipe = build_swipe
+    st.session_state.ai_build_future = get_build_executor().submit(
+        get_ai_recommendations, st.session_state.session_id, get_swipe_writer(), load_catalog(),
+        get_vector_index(), None if taste_vector is None else taste_vector.copy(),
+        known_products_mask()
+    )
+    st.session_state.background_building = True
+    return True
 
-def build_ai_recommendations_sync():
-    """Synchronously build AI recommendations and add to pool"""
+def collect_ai_build():
+    """Merge a finished background build into the session; never waits on one in flight"""
+    future = st.session_state.ai_build_future
+    if future is None or not future.done():
+        return False
+    
+    st.session_state.ai_build_future = None
+    st.session_state.background_building = False
     try:
-        print(f"🚀 Building AI recommendations synchronously...")
-        new_recommendations = get_ai_recommendations()
-        
-        if new_recommendations:
-            # Add to existing recommendations (don't replace)
-            st.session_state.ai_recommendations.extend(new_recommendations)
-            
-            # Remove duplicates based on product name
-            seen_names = set()
-            unique_recs = []
-            for rec in st.session_state.ai_recommendations:
-                name = rec.get('name', 'Unknown')
-                if name not in seen_names:
-                    seen_names.add(name)
-                    unique_recs.append(rec)
-            
-            st.session_state.ai_recommendations = unique_recs
-            st.session_state.recommendations_ready = True
-            
-            print(f"🎯 Added recommendations. Total unique: {len(st.session_state.ai_recommendations)}")
-            return True
-        else:
-            print(f"⚠️ No new recommendations found")
-            return False
-            
+        added = add_ai_recommendations(future.result())
     except Exception as e:
         print(f"💥 AI building failed: {e}")
-        return False
+        added = False
+    
+    # Fresh AI picks take over from random fallback again
+    if (added and st.session_state.random_fallback_mode and
+        st.session_state.ai_index < len(st.session_state.ai_recommendation_ids)):
+        st.session_state.random_fallback_mode = False
+    
+    if st.session_state.pending_builds:
+        build_swipe = max(st.session_state.pending_builds)
+        st.session_state.pending_builds.clear()
+        start_ai_build(build_swipe)
+    
+    return added
+
+def skip_seen_products():
+    """Advance the active list past products the session has already swiped"""
+    seen = st.session_state.seen_products
+    if st.session_state.random_fallback_mode:
+        random_products = st.session_state.random_products
+        while (st.session_state.random_index < len(random_products) and
+               random_products[st.session_state.random_index] in seen):
+            st.session_state.random_index += 1
+    elif st.session_state.ai_mode:
+        recommendation_ids = st.session_state.ai_recommendation_ids
+        while (st.session_state.ai_index < len(recommendation_ids) and
+               int(recommendation_ids[st.session_state.ai_index]) in seen):
+            st.session_state.ai_index += 1
+    else:
+        order = st.session_state.product_order
+        while (st.session_state.current_index < len(order) and
+               int(order[st.session_state.current_index]) in seen):
+            st.session_state.current_index += 1
 
 def get_current_product():
     """Get the current product to display"""
+    skip_seen_products()
     if st.session_state.random_fallback_mode:
         # Random fallback mode - show random products
         if st.session_state.random_index < len(st.session_state.random_products):
-            return st.session_state.random_products[st.session_state.random_index]
+            return load_catalog().row(st.session_state.random_products[st.session_state.random_index])
         else:
             # Load more random products if we've run out
             print(f"🎲 Loading more random products (current: {len(st.session_state.random_products)})")
-            st.session_state.random_products.extend(get_random_products(10))
+            st.session_state.random_products.extend(get_random_product_ids(10, exclude=st.session_state.seen_products))
             print(f"🎲 Now have {len(st.session_state.random_products)} random products")
             if st.session_state.random_index < len(st.session_state.random_products):
-                return st.session_state.random_products[st.session_state.random_index]
+                return load_catalog().row(st.session_state.random_products[st.session_state.random_index])
             else:
                 return None
     elif st.session_state.ai_mode:
         # AI mode - show AI recommendations
-        if st.session_state.ai_index < len(st.session_state.ai_recommendations):
-            return st.session_state.ai_recommendations[st.session_state.ai_index]
+        if st.session_state.ai_index < len(st.session_state.ai_recommendation_ids):
+            return recommended_product(st.session_state.ai_index)
         else:
             # AI recommendations exhausted - switch to random fallback
-            print(f"🎲 AI recommendations exhausted ({st.session_state.ai_index}/{len(st.session_state.ai_recommendations)}), switching to random fallback...")
+            print(f"🎲 AI recommendations exhausted ({st.session_state.ai_index}/{len(st.session_state.ai_recommendation_ids)}), switching to random fallback...")
             st.session_state.random_fallback_mode = True
-            st.session_state.random_products = get_random_products(20)
+            st.session_state.random_products = get_random_product_ids(20, exclude=st.session_state.seen_products)
             st.session_state.random_index = 0
             print(f"🎲 Loaded {len(st.session_state.random_products)} random products for fallback")
             return get_current_product()  # Recursive call to get random product
     else:
         # CSV mode - show products from dataset
-        if st.session_state.current_index < len(st.session_state.products_df):
-            return st.session_state.products_df.iloc[st.session_state.current_index].to_dict()
+        if st.session_state.current_index < len(st.session_state.product_order):
+            row_id = int(st.session_state.product_order[st.session_state.current_index])
+            return load_catalog().row(row_id)
         else:
             return None
 
+def upcoming_products(count=3):
+    """The next few products the session will show, in order"""
+    if st.session_state.random_fallback_mode:
+        start = st.session_state.random_index + 1
+        catalog = load_catalog()
+        return [catalog.row(row_id) for row_id in st.session_state.random_products[start:start + count]]
+    elif st.session_state.ai_mode:
+        start = st.session_state.ai_index + 1
+        end = min(start + count, len(st.session_state.ai_recommendation_ids))
+        return [recommended_product(position) for position in range(start, end)]
+    else:
+        start = st.session_state.current_index + 1
+        catalog = load_catalog()
+        return [catalog.row(int(row_id)) for row_id in st.session_state.product_order[start:start + count]]
+
+def prefetch_upcoming_images(count=3):
+    """Warm the image cache for the next cards so the next swipe is a cache hit"""
+    images = []
+    for product in upcoming_products(count):
+        image_url = product.get('image', '') or product.get('image_url', '')
+        product_url = product.get('product_url', '') or product.get('url', '')
+        images.append((image_url, product_url or None))
+    get_image_cache().prefetch(images)
+
 def next_product():
     """Move to next product"""
     st.session_state.total_swipes += 1
     print(f"👆 Swipe #{st.session_state.total_swipes}")
     
-    # Start building AI recommendations in background from swipe 30 onwards (every 5 swipes)
+    # Pick up any build that finished since the last run
+    collect_ai_build()
+    
+    # Start building AI recommendations in background at swipes 10 and 15
     if (st.session_state.total_swipes >= 10 and 
         st.session_state.total_swipes < 20 and 
         (st.session_state.total_swipes - 10) % 5 == 0 and
         not st.session_state.ai_mode):
-        
-        print(f"🔄 Background: Building AI recommendations at swipe {st.session_state.total_swipes}...")
-        # Mark for processing instead of calling undefined function
-        st.session_state.pending_builds.add(st.session_state.total_swipes)
-    
-    # Process pending builds when we have a moment (not at mode switch)
-    if (st.session_state.pending_builds and 
-        not st.session_state.background_building and 
-        st.session_state.total_swipes < 20):
-        
-        # Process one pending build
-        build_swipe = st.session_state.pending_builds.pop()
-        st.session_state.background_building = True
-        print(f"🔄 Processing AI build for swipe {build_swipe}...")
-        
-        if build_ai_recommendations_sync():
-            print(f"✅ Completed AI build for swipe {build_swipe}")
-        
-        st.session_state.background_building = False
+        start_ai_build(st.session_state.total_swipes)
     
-    # Instant switch to AI mode at 20 swipes (recommendations should be ready)
-    if st.session_state.total_swipes == 20 and not st.session_state.ai_mode:
-        print(f"� Switching to AI mode at 20 swipes...")
-        
-        if st.session_state.recommendations_ready and len(st.session_state.ai_recommendations) > 0:
-            # Instant switch - recommendations are already built!
+    # Switch to AI mode from swipe 20 as soon as recommendations are ready; never block on them
+    if st.session_state.total_swipes >= 20 and not st.session_state.ai_mode:
+        if st.session_state.recommendations_ready and len(st.session_state.ai_recommendation_ids) > 0:
             st.session_state.ai_mode = True
             st.session_state.ai_index = 0
-            print(f"✅ Instant switch! Using {len(st.session_state.ai_recommendations)} pre-built recommendations")
-        else:
-            # Fallback: build recommendations synchronously if background didn't work
-            print(f"⚠️ Background recommendations not ready, building now...")
-            with st.spinner("🤖 Getting AI recommendations..."):
-                if build_ai_recommendations_sync():
-                    st.session_state.ai_mode = True
-                    st.session_state.ai_index = 0
-                    print(f"✅ Fallback: Built {len(st.session_state.ai_recommendations)} recommendations")
-                else:
-                    print(f"❌ No AI recommendations available, continuing with CSV")
+            print(f"✅ Instant switch! Using {len(st.session_state.ai_recommendation_ids)} pre-built recommendations")
+        elif (st.session_state.ai_build_future is None and
+              (st.session_state.last_build_swipe is None or
+               st.session_state.total_swipes - st.session_state.last_build_swipe >= BUILD_RETRY_SWIPES)):
+            # Builds that came back empty are retried every few swipes, not on every swipe
+            print(f"⚠️ Background recommendations not ready, continuing with CSV while building...")
+            start_ai_build(st.session_state.total_swipes)
 
     # Continue building more AI recommendations (every 10 swipes after 20)
     elif (st.session_state.total_swipes > 20 and
           st.session_state.ai_mode and
           (st.session_state.total_swipes - 20) % 10 == 0):
-
-        print(f"🔄 Background: Adding more AI recommendations at swipe {st.session_state.total_swipes}...")
-        with st.spinner("🤖 Getting more recommendations..."):
-            build_ai_recommendations_sync()
+        start_ai_build(st.session_state.total_swipes)
     
     # Move to next product
     if st.session_state.random_fallback_mode:
@@ -283,6 +462,8 @@ def handle_swipe(action):
         if st.session_state.total_swipes != st.session_state.last_saved_swipe:
             # Save immediately to Supermemory
             save_swipe_immediately(action, current_product)
+            update_taste_vector(action, current_product)
+            st.session_state.seen_products.add(current_product.get('row_id'))
             st.session_state.last_saved_swipe = st.session_state.total_swipes
         
         # Move to next product
@@ -290,6 +471,7 @@ def handle_swipe(action):
 
 # Initialize session state
 initialize_session_state()
+collect_ai_build()
 
 # Main UI
 # center this 
@@ -302,7 +484,7 @@ if st.session_state.ai_mode:
     st.caption(f"Showing personalized recommendations based on your preferences")
 else:
     st.info(f"📊 **Discover Mode** - Swipe #{st.session_state.total_swipes}/20")
-    if st.session_state.total_swipes >= 30:
+    if st.session_state.total_swipes >= 10:
         if st.session_state.background_building:
             st.caption(f"🔄 Building AI recommendations in background... Switch at swipe 20!")
         elif st.session_state.recommendations_ready:
@@ -324,53 +506,13 @@ if current_product:
         image_url = current_product.get('image', '') or current_product.get('image_url', '')
         
         if image_url:
-            # Always fetch bytes with headers to avoid hotlinking issues; fallback to direct URL only if needed
-            try:
-                referer = None
-                # Prefer product_url if present, otherwise derive referer from image_url domain
-                product_url = current_product.get('product_url', '') or current_product.get('url', '')
-                if product_url:
-                    referer = product_url
-                else:
-                    try:
-                        from urllib.parse import urlparse
-                        parsed = urlparse(image_url)
-                        referer = f"{parsed.scheme}://{parsed.netloc}/"
-                    except Exception:
-                        referer = None
-
-                headers = {
-                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
-                }
-                if referer:
-                    headers["Referer"] = referer
-
-                resp = requests.get(image_url, headers=headers, timeout=10)
-                if resp.ok and resp.content and resp.headers.get('Content-Type','').startswith('image'):
-                    try:
-                        image_obj = Image.open(BytesIO(resp.content))
-                        img_col1, img_col2, img_col3 = st.columns([1, 2, 1])
-                        with img_col2:
-                            st.image(image_obj, width=120)
-                    except Exception as e:
-                        # Fallback to direct bytes
-                        img_col1, img_col2, img_col3 = st.columns([1, 2, 1])
-                        with img_col2:
-                            st.image(resp.content, width=120)
-                else:
-                    # Fallback to direct URL rendering
-                    try:
-                        img_col1, img_col2, img_col3 = st.columns([1, 2, 1])
-                        with img_col2:
-                            st.image(image_url, width=120)
-                    except Exception:
-                        st.markdown("<p style='text-align: center;'>📷 Image not available</p>", unsafe_allow_html=True)
-            except Exception as _e:
-                # Absolute fallback
+            # Small pre-resized thumbnail from the local cache; fall back to the direct URL if needed
+            product_url = current_product.get('product_url', '') or current_product.get('url', '')
+            thumbnail = get_image_cache().get(image_url, referer=product_url or None)
+            img_col1, img_col2, img_col3 = st.columns([1, 2, 1])
+            with img_col2:
                 try:
-                    img_col1, img_col2, img_col3 = st.columns([1, 2, 1])
-                    with img_col2:
-                        st.image(image_url, width=120)
+                    st.image(thumbnail if thumbnail else image_url, width=120)
                 except Exception:
                     st.markdown("<p style='text-align: center;'>📷 Image not available</p>", unsafe_allow_html=True)
         else:
@@ -405,6 +547,9 @@ if current_product:
     with col3:
         if st.button("❤️ Like", use_container_width=True):
             handle_swipe('like')
+    
+    # Download the next cards' images while the user looks at this one
+    prefetch_upcoming_images()
 
 else:
     if st.session_state.ai_mode:
@@ -0,0 +1,8 @@
+from concurrent.futures import ThreadPoolExecutor
+import streamlit as st
+
+
+@st.cache_resource
+def get_build_executor(max_workers: int = 4) -> ThreadPoolExecutor:
+    """Per-process pool that runs AI recommendation builds off the request path"""
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-build")
@@ -1,25 +1,142 @@
-import requests
-import streamlit as st
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.supermemory.client import get_client, SUPERMEMORY_API_V4_URL
+
+# Swipes merged into a cached response locally before the remote search is re-run
+# so SuperMemory's own memory extraction catches up
+LOCAL_MERGE_LIMIT = 20
+
+# Sessions whose state is kept; the least recently used (or idle past the TTL)
+# are dropped and simply search again next time
+MAX_SESSIONS = 1024
+SESSION_TTL = 60 * 60
+
+
+class _SessionPreferences:
+    """A session's write version, documents saved since its cached response, and that response"""
+
+    def __init__(self):
+        self.version = 0
+        self.saved_documents: List[Tuple[int, Dict[str, Any]]] = []
+        self.cache: Optional[Tuple[int, dict, int]] = None  # (version, response, locally merged swipes)
+        self.searching = 0
+        self.touched = time.monotonic()
+
+
+# Shared by the script thread, the swipe writer and recommendation builds
+_lock = threading.Lock()
+_sessions: "OrderedDict[str, _SessionPreferences]" = OrderedDict()
+
+def _session(session_id: str) -> _SessionPreferences:
+    """Get (or create) a session's state and mark it used; call with _lock held"""
+    state = _sessions.get(session_id)
+    if state is None:
+        state = _sessions[session_id] = _SessionPreferences()
+    state.touched = time.monotonic()
+    _sessions.move_to_end(session_id)
+
+    # Evict from the least recently used end; sessions with a search in flight stay
+    idle_before = state.touched - SESSION_TTL
+    for _ in range(len(_sessions) - 1):
+        oldest_id, oldest = next(iter(_sessions.items()))
+        if len(_sessions) <= MAX_SESSIONS and oldest.touched >= idle_before:
+            break
+        if oldest.searching:
+            _sessions.move_to_end(oldest_id)
+        else:
+            del _sessions[oldest_id]
+    return state
+
+def record_saved_preferences(session_id: str, documents: List[Dict[str, Any]]) -> int:
+    """
+    Bump a session's write version after its swipes were saved to SuperMemory.
+
+    Args:
+        session_id: Session whose swipes were saved
+        documents: The saved /documents payloads
+
+    Returns:
+        int: The session's new write version
+    """
+    with _lock:
+        state = _session(session_id)
+        state.version += 1
+        if state.cache is not None or state.searching:
+            # Only needed for merging into a cached (or about to be cached) response
+            state.saved_documents.extend((state.version, document) for document in documents)
+        return state.version
+
+def get_write_version(session_id: str) -> int:
+    with _lock:
+        state = _sessions.get(session_id)
+        return state.version if state is not None else 0
+
+def preference_memory(document: Dict[str, Any]) -> dict:
+    """A saved swipe document in the shape of a /v4/search result"""
+    metadata = document.get("metadata", {})
+    preference_type = metadata.get("preference_type", "liked").replace("_", "-")
+    return {
+        "memory": f"User {preference_type} {metadata.get('name', 'a product')}. {document.get('content', '')}",
+        "metadata": metadata,
+    }
+
+def search_user_preferences(session_id: str) -> dict:
+    """Run the /v4/search preference query for a session"""
+    url = f"{SUPERMEMORY_API_V4_URL}/search"
+
+    payload = {"threshold":0.2,"include":{"documents":False,"summaries":False,"relatedMemories":False,"forgottenMemories":False},"limit":10,"rerank":False,"rewriteQuery":False,"q":"What are the user's clothing and fashion preferences based on their liked, disliked, and super-liked products?","containerTag":f"{session_id}_user"}
+
+    response = get_client().post(url, payload)
+
+    return response.json()
 
 def get_user_preferences(session_id: str) -> dict:
     """
     Query user preferences from Supermemory and return the response.
-    
+
+    The response is cached per session under its write version: if nothing was
+    saved since the last call the cached response is returned as is, and swipes
+    saved since then are merged in locally instead of searching again.
+
     Args:
         session_id: Session ID to search for
-        
+
     Returns:
-        dict: Raw response from Supermemory API
+        dict: Raw response from Supermemory API (plus locally merged swipes)
     """
-    url = "https://api.supermemory.ai/v4/search"
+    with _lock:
+        state = _session(session_id)
+        version = state.version
+        if state.cache is not None:
+            cached_version, response, merged = state.cache
+            if cached_version == version:
+                return response
 
-    payload = {"threshold":0.2,"include":{"documents":False,"summaries":False,"relatedMemories":False,"forgottenMemories":False},"limit":10,"rerank":False,"rewriteQuery":False,"q":"What are the user's clothing and fashion preferences based on their liked, disliked, and super-liked products?","containerTag":f"{session_id}_user"}
+            new_documents = [document for saved_version, document in state.saved_documents
+                             if cached_version < saved_version <= version]
+            if merged + len(new_documents) <= LOCAL_MERGE_LIMIT:
+                response = dict(response)
+                response["results"] = list(response["results"]) + [
+                    preference_memory(document) for document in new_documents]
+                state.cache = (version, response, merged + len(new_documents))
+                state.saved_documents = [entry for entry in state.saved_documents if entry[0] > version]
+                return response
 
-    headers = {
-        "Authorization": f"Bearer {__import__('src.supermemory.client', fromlist=['get_api_key']).get_api_key()}",
-        "Content-Type": "application/json"
-    }
-    
-    response = requests.post(url, json=payload, headers=headers)
-    
-    return response.json()
\ No newline at end of file
+        state.searching += 1
+
+    try:
+        response = search_user_preferences(session_id)
+    finally:
+        with _lock:
+            state.searching -= 1
+
+    if isinstance(response, dict) and 'results' in response:
+        with _lock:
+            # Keep documents saved after this search for the next local merge
+            state.cache = (version, response, 0)
+            state.saved_documents = [entry for entry in state.saved_documents if entry[0] > version]
+
+    return response
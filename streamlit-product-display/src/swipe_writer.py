@@ -0,0 +1,215 @@
+import atexit
+import queue
+import threading
+import time
+import requests
+import streamlit as st
+from typing import Dict, Any, List, Optional
+
+from src.supermemory.client import get_client
+from user_memory import build_preference_payload
+from get_user_preference import record_saved_preferences
+
+_STOP = object()
+
+# Responses that mean the batch was not processed, so posting it again can't duplicate swipes
+RETRYABLE_STATUS = (429, 503)
+
+
+class _FlushRequest:
+    """Control message asking the worker to send buffered swipes now"""
+
+    def __init__(self, session_id: Optional[str] = None):
+        self.session_id = session_id  # None flushes every session
+        self.done = threading.Event()
+
+
+class SwipeWriter:
+    """
+    Write-behind queue that persists swipes to SuperMemory on a background thread.
+
+    `submit()` only enqueues the document and returns, so the script run never
+    waits on the `/documents` round trip. The queue is bounded: when it is full
+    new swipes are dropped and counted rather than blocking the UI.
+
+    The worker coalesces swipes per session and sends them as a single
+    `/documents/batch` call once `batch_size` swipes are buffered, once the
+    oldest buffered swipe is `flush_interval` seconds old, or when a flush is
+    requested (e.g. right before a recommendation query).
+
+    A batch is only retried when the server cannot have stored it: connection
+    errors and 429/503 responses. Read timeouts and other 5xx responses may
+    follow an accepted write, so those batches are counted as failed instead of
+    being posted again.
+    """
+
+    def __init__(self, max_queue: int = 1000, batch_size: int = 10, flush_interval: float = 5.0,
+                 max_retries: int = 3, retry_backoff: float = 0.5, timeout: float = 10):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.timeout = timeout
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self._first_buffered: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = {
+            "enqueued": 0,
+            "sent": 0,
+            "failed": 0,
+            "dropped": 0,
+            "retries": 0,
+            "batches": 0,
+            "buffered": 0,
+            "high_water": 0,
+        }
+        self._thread = threading.Thread(target=self._run, name="swipe-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def submit(self, session_id: str, product: Dict[str, Any], preference_type: str) -> bool:
+        """
+        Queue a swipe for persistence.
+
+        Args:
+            session_id: Session that made the swipe
+            product: Dictionary containing product information
+            preference_type: Type of preference ("liked", "super_liked" or "disliked")
+
+        Returns:
+            bool: True if queued, False if dropped because the queue is full
+        """
+        payload = build_preference_payload(product, preference_type, session_id)
+        try:
+            self._queue.put_nowait((session_id, payload))
+        except queue.Full:
+            self._bump("dropped")
+            return False
+
+        with self._lock:
+            self._stats["enqueued"] += 1
+            self._stats["high_water"] = max(self._stats["high_water"], self._queue.qsize())
+        return True
+
+    def metrics(self) -> Dict[str, int]:
+        """Counters plus current depth, for backpressure monitoring"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["depth"] = self._queue.qsize()
+        stats["capacity"] = self._queue.maxsize
+        return stats
+
+    def flush_session(self, session_id: str, timeout: Optional[float] = 5) -> bool:
+        """Send a session's buffered swipes now; False if not done within timeout"""
+        return self._request_flush(_FlushRequest(session_id), timeout)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Send every buffered swipe now; False if not done within timeout"""
+        return self._request_flush(_FlushRequest(), timeout)
+
+    def shutdown(self, timeout: float = 10) -> None:
+        """Flush pending swipes and stop the worker (registered with atexit)"""
+        if not self._thread.is_alive():
+            return
+        self.flush(timeout)
+        try:
+            self._queue.put(_STOP, timeout=1)
+        except queue.Full:
+            return
+        self._thread.join(timeout=1)
+
+    def _request_flush(self, request: _FlushRequest, timeout: Optional[float]) -> bool:
+        if not self._thread.is_alive():
+            return False
+        try:
+            self._queue.put(request, timeout=timeout)
+        except queue.Full:
+            return False
+        return request.done.wait(timeout)
+
+    def _bump(self, key: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[key] += amount
+
+    def _next_timeout(self) -> Optional[float]:
+        if not self._first_buffered:
+            return None
+        oldest = min(self._first_buffered.values())
+        return max(0.0, oldest + self.flush_interval - time.monotonic())
+
+    def _run(self) -> None:
+        while True:
+            try:
+                item = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                item = None
+
+            try:
+                if item is _STOP:
+                    self._flush_buffers(list(self._buffers))
+                    return
+                if isinstance(item, _FlushRequest):
+                    sessions = list(self._buffers) if item.session_id is None else [item.session_id]
+                    try:
+                        self._flush_buffers(sessions)
+                    finally:
+                        item.done.set()
+                elif item is not None:
+                    session_id, payload = item
+                    self._buffers.setdefault(session_id, []).append(payload)
+                    self._first_buffered.setdefault(session_id, time.monotonic())
+                    self._bump("buffered")
+                    if len(self._buffers[session_id]) >= self.batch_size:
+                        self._flush_buffers([session_id])
+
+                now = time.monotonic()
+                expired = [sid for sid, t in self._first_buffered.items() if now - t >= self.flush_interval]
+                self._flush_buffers(expired)
+            except Exception as e:
+                print(f"❌ Swipe writer error: {e}")
+            finally:
+                if item is not None:
+                    self._queue.task_done()
+
+    def _flush_buffers(self, session_ids: List[str]) -> None:
+        for session_id in session_ids:
+            documents = self._buffers.pop(session_id, None)
+            self._first_buffered.pop(session_id, None)
+            if documents:
+                self._bump("buffered", -len(documents))
+                self._send_batch(session_id, documents)
+
+    def _send_batch(self, session_id: str, documents: List[Dict[str, Any]]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = get_client().post_documents_batch(documents, timeout=self.timeout)
+                if response.status_code == 200:
+                    self._bump("sent", len(documents))
+                    self._bump("batches")
+                    record_saved_preferences(session_id, documents)
+                    return
+                error = f"{response.status_code} - {response.text}"
+                if response.status_code not in RETRYABLE_STATUS:
+                    break  # Client errors won't succeed on retry; other 5xx may have been stored
+            except requests.exceptions.ConnectionError as e:
+                error = str(e)  # Never reached the server
+            except requests.exceptions.RequestException as e:
+                error = str(e)
+                break  # e.g. a read timeout: the batch may already be stored
+            except Exception as e:
+                error = str(e)
+                break  # Misconfiguration (e.g. missing API key) won't succeed on retry
+
+            if attempt < self.max_retries:
+                self._bump("retries")
+                time.sleep(self.retry_backoff * (2 ** attempt))
+
+        self._bump("failed", len(documents))
+        print(f"❌ Failed to save batch of {len(documents)} swipes: {error}")
+
+
+@st.cache_resource
+def get_swipe_writer() -> SwipeWriter:
+    """Process-wide swipe writer shared by all sessions"""
+    return SwipeWriter()
@@ -1,30 +1,15 @@
-import pandas as pd
-import random
 import streamlit as st
-import os
+from utils.catalog import load_catalog
 
-@st.cache_data
-def load_products():
-    """Load products from CSV file"""
+def get_random_product_ids(num_products=10, exclude=None):
+    """Sample catalog row ids in O(k), skipping any in `exclude`; no other rows are touched or copied"""
     try:
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
-        app_csv_path = os.path.join(base_dir, 'data', 'final_products_complete.csv')
-        project_root = os.path.abspath(os.path.join(base_dir, '..'))
-        root_csv_path = os.path.join(project_root, 'final_products_complete.csv')
-
-        csv_path = app_csv_path if os.path.exists(app_csv_path) else root_csv_path
-        df = pd.read_csv(csv_path)
-        # Normalize image column to 'image'
-        if 'image' not in df.columns and 'image_url' in df.columns:
-            df = df.rename(columns={'image_url': 'image'})
-        return df.to_dict('records')
+        return load_catalog().sample_ids(num_products, exclude)
     except Exception as e:
         st.error(f"Error loading products: {e}")
         return []
 
-def get_random_products(num_products=10):
-    """Get random products from the dataset"""
-    products = load_products()
-    if len(products) > num_products:
-        return random.sample(products, num_products)
-    return products
\ No newline at end of file
+def get_random_products(num_products=10, exclude=None):
+    """Get random products from the shared catalog (only the sampled rows are materialized)"""
+    catalog = load_catalog()
+    return [catalog.row(row_id) for row_id in get_random_product_ids(num_products, exclude)]
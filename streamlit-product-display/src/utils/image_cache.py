@@ -0,0 +1,280 @@
+import os
+import hashlib
+import threading
+import time
+import requests
+import streamlit as st
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urlparse
+from PIL import Image, features
+from requests.adapters import HTTPAdapter
+
+THUMBNAIL_WIDTH = 240
+
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+}
+
+_APP_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+DEFAULT_CACHE_DIR = os.path.join(_APP_ROOT, '.image_cache')
+
+
+class ImageCache:
+    """
+    Two-tier cache of pre-resized product thumbnails.
+
+    Thumbnails are content-addressed by the SHA-256 of the image URL and stored
+    on disk (WebP when Pillow supports it, JPEG otherwise) with least-recently-used
+    eviction once `max_bytes` is exceeded. The most recently used thumbnails are
+    also kept in memory so reruns of the same card never touch the disk.
+
+    `prefetch()` warms upcoming images on a small thread pool; a `get()` for an
+    image that is already being fetched waits for that download instead of
+    starting a second one. URLs that fail (403s, timeouts, non-images) are
+    remembered for `failure_ttl` seconds so reruns don't fetch them again.
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = 256 * 1024 * 1024,
+                 hot_items: int = 256, thumbnail_width: int = THUMBNAIL_WIDTH, timeout: float = 10,
+                 prefetch_workers: int = 4, failure_ttl: float = 300, max_failures: int = 4096):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hot_items = hot_items
+        self.thumbnail_width = thumbnail_width
+        self.timeout = timeout
+        self.failure_ttl = failure_ttl
+        self.max_failures = max_failures
+        self.format = "WEBP" if features.check("webp") else "JPEG"
+        self._extension = ".webp" if self.format == "WEBP" else ".jpg"
+        self._hot: "OrderedDict[str, bytes]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._failed: "OrderedDict[str, float]" = OrderedDict()  # key -> retry-after (monotonic)
+        self._lock = threading.Lock()
+        self._prefetcher = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="image-prefetch")
+
+        self.session = requests.Session()
+        self.session.headers.update(BROWSER_HEADERS)
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=16, max_retries=1)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        os.makedirs(self.root, exist_ok=True)
+        self._disk_bytes = sum(os.path.getsize(p) for p in self._disk_files())
+
+    def get(self, image_url: str, referer: Optional[str] = None) -> Optional[bytes]:
+        """
+        Return thumbnail bytes for an image URL, fetching and resizing on a miss.
+
+        Args:
+            image_url: Full-size product image URL
+            referer: Page to send as Referer (avoids hotlink blocking); defaults to the image's origin
+
+        Returns:
+            bytes: Encoded thumbnail, or None if the image couldn't be fetched or decoded
+        """
+        key = self._key(image_url)
+        thumbnail = self._hot_get(key)
+        if thumbnail is not None:
+            return thumbnail
+        if self._recently_failed(key):
+            return None
+
+        # Piggyback on a prefetch that is already downloading this image
+        with self._lock:
+            pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                return pending.result(timeout=self.timeout)
+            except Exception:
+                pass
+
+        return self._load(key, image_url, referer)
+
+    def prefetch(self, images: Iterable[Tuple[str, Optional[str]]]) -> int:
+        """
+        Warm the cache for upcoming images in the background.
+
+        Args:
+            images: (image_url, referer) pairs, nearest first
+
+        Returns:
+            int: Number of downloads scheduled (cached or in-flight images are skipped)
+        """
+        scheduled = 0
+        for image_url, referer in images:
+            if not image_url:
+                continue
+            key = self._key(image_url)
+            with self._lock:
+                if key in self._hot or key in self._inflight:
+                    continue
+            if self._recently_failed(key):
+                continue
+            if os.path.exists(self._path(key)):
+                continue
+
+            future = Future()
+            with self._lock:
+                if key in self._inflight:
+                    continue
+                self._inflight[key] = future
+            self._prefetcher.submit(self._prefetch_one, future, key, image_url, referer)
+            scheduled += 1
+        return scheduled
+
+    def _prefetch_one(self, future: Future, key: str, image_url: str, referer: Optional[str]) -> None:
+        try:
+            future.set_result(self._load(key, image_url, referer))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _load(self, key: str, image_url: str, referer: Optional[str]) -> Optional[bytes]:
+        thumbnail = self._disk_get(key)
+        if thumbnail is None:
+            thumbnail = self._fetch(image_url, referer)
+            if thumbnail is None:
+                self._mark_failed(key)
+                return None
+            self._disk_put(key, thumbnail)
+
+        self._hot_put(key, thumbnail)
+        return thumbnail
+
+    def contains(self, image_url: str) -> bool:
+        key = self._key(image_url)
+        with self._lock:
+            if key in self._hot:
+                return True
+        return os.path.exists(self._path(key))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hot_items": len(self._hot), "disk_bytes": self._disk_bytes, "max_bytes": self.max_bytes}
+
+    def _key(self, image_url: str) -> str:
+        return hashlib.sha256(image_url.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key + self._extension)
+
+    def _disk_files(self):
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                if filename.endswith(self._extension):
+                    yield os.path.join(dirpath, filename)
+
+    def _recently_failed(self, key: str) -> bool:
+        with self._lock:
+            retry_after = self._failed.get(key)
+            if retry_after is None:
+                return False
+            if time.monotonic() < retry_after:
+                return True
+            del self._failed[key]
+            return False
+
+    def _mark_failed(self, key: str) -> None:
+        with self._lock:
+            self._failed[key] = time.monotonic() + self.failure_ttl
+            self._failed.move_to_end(key)
+            while len(self._failed) > self.max_failures:
+                self._failed.popitem(last=False)
+
+    def _hot_get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            thumbnail = self._hot.get(key)
+            if thumbnail is not None:
+                self._hot.move_to_end(key)
+            return thumbnail
+
+    def _hot_put(self, key: str, thumbnail: bytes) -> None:
+        with self._lock:
+            self._hot[key] = thumbnail
+            self._hot.move_to_end(key)
+            while len(self._hot) > self.hot_items:
+                self._hot.popitem(last=False)
+
+    def _disk_get(self, key: str) -> Optional[bytes]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                thumbnail = f.read()
+            os.utime(path)  # mtime doubles as the LRU clock
+            return thumbnail
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, thumbnail: bytes) -> None:
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(thumbnail)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️ Couldn't cache thumbnail: {e}")
+            return
+
+        with self._lock:
+            self._disk_bytes += len(thumbnail)
+            over_budget = self._disk_bytes > self.max_bytes
+        if over_budget:
+            self._evict()
+
+    def _evict(self) -> None:
+        """Delete least recently used thumbnails until the cache is at 90% of its budget"""
+        entries = []
+        for path in self._disk_files():
+            try:
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+            except OSError:
+                continue
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                continue
+
+        with self._lock:
+            self._disk_bytes = total
+
+    def _fetch(self, image_url: str, referer: Optional[str]) -> Optional[bytes]:
+        if not referer:
+            parsed = urlparse(image_url)
+            referer = f"{parsed.scheme}://{parsed.netloc}/" if parsed.netloc else None
+        headers = {"Referer": referer} if referer else {}
+
+        try:
+            resp = self.session.get(image_url, headers=headers, timeout=self.timeout)
+            if not (resp.ok and resp.content and resp.headers.get('Content-Type', '').startswith('image')):
+                return None
+            image = Image.open(BytesIO(resp.content))
+            image = image.convert("RGB")
+            image.thumbnail((self.thumbnail_width, self.thumbnail_width * 4))
+            out = BytesIO()
+            image.save(out, format=self.format, quality=80)
+            return out.getvalue()
+        except Exception as e:
+            print(f"⚠️ Couldn't fetch image {image_url}: {e}")
+            return None
+
+
+@st.cache_resource
+def get_image_cache() -> ImageCache:
+    """Process-wide thumbnail cache shared by all sessions"""
+    return ImageCache()
@@ -0,0 +1,153 @@
+import os
+import re
+import zlib
+import numpy as np
+import streamlit as st
+from typing import Optional, Tuple, Dict, Any
+
+from .catalog import Catalog, load_catalog, find_catalog_csv
+
+EMBEDDING_DIM = 1024
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to with which appears image item clothing there no any".split()
+)
+
+
+def _tokens(text: str):
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS]
+    # Bigrams keep "green pants" apart from "green top" + "black pants"
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def hash_text(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Signed feature-hashing term counts (log-scaled) for a piece of text"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for token in _tokens(text):
+        h = zlib.crc32(token.encode("utf-8"))
+        vector[h % dim] += 1.0 if h & 0x80000000 else -1.0
+    return np.sign(vector) * np.log1p(np.abs(vector))
+
+
+def embeddings_path_for(csv_path: str) -> Tuple[str, str]:
+    """Paths of the precomputed embedding matrix and IDF weights next to a CSV"""
+    stem = os.path.splitext(csv_path)[0]
+    return stem + ".embeddings.npy", stem + ".idf.npy"
+
+
+def _product_text(catalog: Catalog, row_id: int) -> str:
+    return f"{catalog.column('name')[row_id]} {catalog.column('clothing_features')[row_id]}"
+
+
+def build_embeddings(catalog: Catalog, dim: int = EMBEDDING_DIM) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Embed every catalog product with TF-IDF weighted feature hashing.
+
+    Args:
+        catalog: Product catalog; row i of the matrix is catalog row id i
+        dim: Embedding dimension
+
+    Returns:
+        tuple: (L2-normalized float32 matrix of shape (rows, dim), float32 IDF weights)
+    """
+    counts = np.zeros((len(catalog), dim), dtype=np.float32)
+    for row_id in range(len(catalog)):
+        counts[row_id] = hash_text(_product_text(catalog, row_id), dim)
+    doc_freq = np.count_nonzero(counts, axis=0)
+    idf = (np.log((1 + len(catalog)) / (1 + doc_freq)) + 1).astype(np.float32)
+    matrix = counts * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms == 0, 1, norms)
+    return matrix.astype(np.float32), idf
+
+
+def save_embeddings(catalog: Catalog, csv_path: str, dim: int = EMBEDDING_DIM) -> str:
+    """Precompute embeddings offline and store them as .npy files next to the CSV"""
+    matrix, idf = build_embeddings(catalog, dim)
+    matrix_path, idf_path = embeddings_path_for(csv_path)
+    np.save(matrix_path, matrix)
+    np.save(idf_path, idf)
+    print(f"🧮 Saved {matrix.shape[0]}x{matrix.shape[1]} embeddings to {matrix_path}")
+    return matrix_path
+
+
+class VectorIndex:
+    """
+    Flat in-process vector index over the catalog.
+
+    Search is a single matrix-vector product followed by a partial sort, which is
+    a few milliseconds for a catalog of this size.
+    """
+
+    def __init__(self, matrix: np.ndarray, idf: np.ndarray):
+        self.matrix = matrix
+        self.idf = idf
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def embed(self, text: str) -> np.ndarray:
+        """Embed free text (e.g. collective memory) into the catalog space"""
+        vector = hash_text(text, self.matrix.shape[1]) * self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def vector(self, row_id: int) -> np.ndarray:
+        return np.asarray(self.matrix[row_id])
+
+    def product_vector(self, product: Dict[str, Any]) -> np.ndarray:
+        """Precomputed vector for catalog products, embedded on the fly for anything else"""
+        row_id = product.get('row_id')
+        if row_id is not None and 0 <= row_id < len(self):
+            return self.vector(row_id)
+        features = product.get('clothing_features') or product.get('description', '')
+        return self.embed(f"{product.get('name', '')} {features}")
+
+    def search(self, query: np.ndarray, k: int = 20,
+               exclude: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k catalog rows by cosine similarity.
+
+        Args:
+            query: Query vector (normalized or not; ranking is the same)
+            k: Number of results
+            exclude: Optional row ids or boolean mask of rows to skip
+
+        Returns:
+            tuple: (row ids, scores), best first
+        """
+        scores = self.matrix @ query
+        if exclude is not None and len(exclude):
+            scores[exclude] = -np.inf
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        top = top[np.isfinite(scores[top])]
+        return top, scores[top]
+
+
+@st.cache_resource
+def load_vector_index() -> VectorIndex:
+    """Load precomputed embeddings (memory-mapped), or embed the catalog in-process"""
+    csv_path = find_catalog_csv()
+    matrix_path, idf_path = embeddings_path_for(csv_path)
+    catalog = load_catalog()
+    if os.path.exists(matrix_path) and os.path.exists(idf_path):
+        # Same freshness rule as load_catalog: a CSV newer than the matrix may have
+        # rewritten rows even if the row count is unchanged
+        if os.path.exists(csv_path) and os.path.getmtime(matrix_path) < os.path.getmtime(csv_path):
+            print(f"⚠️ Embeddings older than {csv_path}, rebuilding")
+        else:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            if matrix.shape[0] == len(catalog):
+                print(f"🧮 Mapped {matrix.shape[0]} product embeddings from {matrix_path}")
+                return VectorIndex(matrix, np.load(idf_path))
+            print(f"⚠️ Embeddings out of date ({matrix.shape[0]} rows vs {len(catalog)} products), rebuilding")
+
+    matrix, idf = build_embeddings(catalog)
+    print(f"🧮 Embedded {len(catalog)} products in-process (run scripts/build_catalog.py to precompute)")
+    return VectorIndex(matrix, idf)
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# The app modules import each other top-level (from utils.catalog import ...),
+# the vision pipeline does the same, and shared code lives under src.supermemory
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+for path in (PROJECT_ROOT,
+             os.path.join(PROJECT_ROOT, "src"),
+             os.path.join(PROJECT_ROOT, "pipelines", "vision")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
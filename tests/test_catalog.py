@@ -0,0 +1,35 @@
+import pandas as pd
+import pytest
+
+from utils.catalog import CATALOG_COLUMNS, Catalog, binary_path_for, compile_catalog
+
+
+@pytest.fixture
+def products_csv(tmp_path):
+    path = tmp_path / "products.csv"
+    pd.DataFrame({
+        "name": ["Airlift Bra", "Airlift Legging", "Airlift Bra", "Dropped"],
+        "product_url": ["https://a/1", "https://a/2", "https://b/1", "https://a/3"],
+        "image_url": ["https://img/1.jpg", "https://img/2.jpg", "https://img/1.jpg", "https://img/3.jpg"],
+        "source": ["alo_yoga", "alo_yoga", "vuori", "alo_yoga"],
+        "clothing_features": ["A black bra.", "Brown leggings, café colour.", "A black bra.", None],
+    }).to_csv(path, index=False)
+    return str(path)
+
+
+def test_binary_catalog_matches_csv(products_csv):
+    from_csv = Catalog.from_csv(products_csv)
+    binary_path = compile_catalog(products_csv)
+    assert binary_path == binary_path_for(products_csv)
+    from_binary = Catalog.from_binary(binary_path)
+
+    assert len(from_binary) == len(from_csv) == 3  # Rows with NaN are dropped
+    assert from_binary.column_names == from_csv.column_names == CATALOG_COLUMNS
+    for row_id in range(len(from_csv)):
+        assert from_binary.row(row_id) == from_csv.row(row_id)
+
+
+def test_lookup_id(products_csv):
+    catalog = Catalog.from_binary(compile_catalog(products_csv))
+    assert catalog.lookup_id("Airlift Bra", "vuori", "https://b/1") == 2
+    assert catalog.lookup_id("Airlift Bra", "alo_yoga", "https://b/1") is None
@@ -0,0 +1,30 @@
+import numpy as np
+from PIL import Image
+
+from dedupe import NearDuplicateIndex, dhash, mean_color
+
+
+def _shot(tint, seed=0):
+    """The same grayscale pattern tinted into a colorway"""
+    pattern = np.random.default_rng(seed).integers(40, 256, size=(64, 48, 1))
+    return Image.fromarray((pattern * np.array(tint)).astype(np.uint8))
+
+
+def _add(index, url, image):
+    return index.add(url, dhash(image), mean_color(image))
+
+
+def test_colorway_kept_apart():
+    red, blue = _shot([1, .3, .3]), _shot([.3, .3, 1])
+    index = NearDuplicateIndex()
+    assert _add(index, "red.jpg", red) == "red.jpg"
+    assert _add(index, "blue.jpg", blue) == "blue.jpg"
+    assert index.members("red.jpg") == ["red.jpg"]
+
+
+def test_resized_duplicate_grouped():
+    red = _shot([1, .3, .3])
+    index = NearDuplicateIndex()
+    _add(index, "red.jpg", red)
+    assert _add(index, "red_large.jpg", red.resize((96, 128))) == "red.jpg"
+    assert index.expand({"red.jpg": "a red top"}) == {"red.jpg": "a red top", "red_large.jpg": "a red top"}
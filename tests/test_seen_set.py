@@ -0,0 +1,34 @@
+import numpy as np
+
+from utils.seen_set import SeenSet
+
+
+def test_add_and_contains():
+    seen = SeenSet(20)
+    assert seen.add(3)
+    assert seen.add(19)
+    assert not seen.add(3)  # Already seen
+    assert not seen.add(20)  # Not a catalog row
+    assert not seen.add(None)
+
+    assert 3 in seen and 19 in seen
+    assert 4 not in seen and -1 not in seen and None not in seen
+    assert len(seen) == 2
+
+
+def test_mask():
+    seen = SeenSet(10)
+    for row_id in (0, 7, 8):
+        seen.add(row_id)
+    mask = seen.mask()
+    assert mask.dtype == bool and mask.shape == (10,)
+    assert np.flatnonzero(mask).tolist() == [0, 7, 8]
+
+
+def test_copy_is_independent():
+    seen = SeenSet(10)
+    seen.add(1)
+    other = seen.copy()
+    other.add(2)
+    assert 2 not in seen and len(seen) == 1
+    assert 1 in other and len(other) == 2
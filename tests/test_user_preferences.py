@@ -0,0 +1,61 @@
+import pytest
+
+import get_user_preference as preferences
+
+
+@pytest.fixture(autouse=True)
+def sessions(monkeypatch):
+    """Fresh session state and a counting stand-in for the remote search"""
+    monkeypatch.setattr(preferences, "_sessions", type(preferences._sessions)())
+    calls = []
+
+    def search(session_id):
+        calls.append(session_id)
+        return {"results": [{"memory": f"search {len(calls)}", "metadata": {}}]}
+
+    monkeypatch.setattr(preferences, "search_user_preferences", search)
+    return calls
+
+
+def _document(name):
+    return {"content": name, "metadata": {"name": name, "preference_type": "super_liked"}}
+
+
+def test_cached_response_reused_at_same_version(sessions):
+    first = preferences.get_user_preferences("a")
+    assert preferences.get_user_preferences("a") is first
+    assert sessions == ["a"]
+
+
+def test_saved_swipes_merged_locally(sessions):
+    preferences.get_user_preferences("a")
+    version = preferences.record_saved_preferences("a", [_document("Black Bra")])
+    assert preferences.get_write_version("a") == version == 1
+
+    response = preferences.get_user_preferences("a")
+    assert sessions == ["a"]  # No second search
+    assert [r["memory"] for r in response["results"]] == [
+        "search 1", "User super-liked Black Bra. Black Bra"]
+
+
+def test_search_again_past_merge_limit(sessions, monkeypatch):
+    monkeypatch.setattr(preferences, "LOCAL_MERGE_LIMIT", 1)
+    preferences.get_user_preferences("a")
+    preferences.record_saved_preferences("a", [_document("Black Bra"), _document("Red Dress")])
+    preferences.get_user_preferences("a")
+    assert sessions == ["a", "a"]
+
+
+def test_lru_eviction_skips_searching_sessions(monkeypatch):
+    monkeypatch.setattr(preferences, "MAX_SESSIONS", 2)
+    with preferences._lock:
+        preferences._session("busy").searching = 1
+        preferences._session("idle")
+        preferences._session("new")
+    # The busy session was oldest but is kept (moved to the recent end) instead
+    assert list(preferences._sessions) == ["new", "busy"]
+
+    with preferences._lock:
+        preferences._sessions["busy"].searching = 0
+        preferences._session("newer")
+    assert list(preferences._sessions) == ["busy", "newer"]
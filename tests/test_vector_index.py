@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from utils.vector_index import VectorIndex, build_embeddings
+
+
+class _Catalog:
+    """Just the columns build_embeddings reads"""
+
+    def __init__(self, names, features):
+        self._columns = {"name": names, "clothing_features": features}
+
+    def __len__(self):
+        return len(self._columns["name"])
+
+    def column(self, name):
+        return self._columns[name]
+
+
+@pytest.fixture
+def index():
+    catalog = _Catalog(
+        ["Black Bra", "Black Sports Bra", "Black Legging", "Red Dress"],
+        ["black cotton bra", "black sports bra with straps", "black high waist legging", "red silk dress"],
+    )
+    return VectorIndex(*build_embeddings(catalog, dim=256))
+
+
+def test_search_ranks_by_similarity(index):
+    row_ids, scores = index.search(index.embed("black bra"), k=2)
+    assert sorted(row_ids.tolist()) == [0, 1]
+    assert scores[0] >= scores[1]
+
+
+def test_search_excludes_mask(index):
+    exclude = np.array([True, False, False, False])
+    row_ids, _ = index.search(index.embed("black bra"), k=4, exclude=exclude)
+    assert 0 not in row_ids.tolist()
+    assert len(row_ids) == 3
+
+
+def test_search_excludes_row_ids(index):
+    row_ids, _ = index.search(index.embed("black bra"), k=4, exclude=np.array([0, 1]))
+    assert sorted(row_ids.tolist()) == [2, 3]
@@ -1,74 +1,170 @@
 # read data from unified csv and download images
 import os
-import pandas as pd
+import json
+import argparse
+import threading
+import concurrent.futures
 import requests
+from requests.adapters import HTTPAdapter
 from tqdm import tqdm
 from urllib.parse import urlparse
-from pathlib import Path
+
+from preprocess import load_unified_dataset, save_unified_dataset
 
 # I want to also be able to relate the image back to product so keep the index number of image same as product index
 
-def download_image(image_url, save_dir, index=None):
-    """Download an image from a URL and save it to the specified directory."""
-    try:
-        response = requests.get(image_url, timeout=10)
-        response.raise_for_status()  # Raise an error for bad responses
-        parsed_url = urlparse(image_url)
-        filename = os.path.basename(parsed_url.path)
+CHUNK_SIZE = 64 * 1024
+INDEX_FILENAME = ".download_index.json"
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(host, pool_size=8):
+    """One pooled session per image host so connections are reused across downloads"""
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[host] = session
+        return session
+
+
+class DownloadIndex:
+    """Sidecar file remembering each image's URL, ETag and Last-Modified for conditional re-downloads"""
+
+    def __init__(self, save_dir):
+        self.path = os.path.join(save_dir, INDEX_FILENAME)
+        self.lock = threading.Lock()
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def get(self, filename):
+        with self.lock:
+            return self.entries.get(filename)
+
+    def put(self, filename, entry):
+        with self.lock:
+            self.entries[filename] = entry
+
+    def save(self):
+        with self.lock:
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
 
-        if index is not None:
-            # If index is provided, rename the file to include the index
-            save_path = os.path.join(save_dir, f"{index}_{filename}")
 
-        with open(save_path, 'wb') as f:
-            f.write(response.content)
+def image_save_path(image_url, save_dir, index=None):
+    filename = os.path.basename(urlparse(image_url).path)
+    if index is not None:
+        # If index is provided, rename the file to include the index
+        filename = f"{index}_{filename}"
+    return os.path.join(save_dir, filename)
+
+def download_image(image_url, save_dir, index=None, download_index=None, refresh=False):
+    """
+    Stream an image from a URL to the specified directory.
+
+    Files that already exist are skipped unless `refresh` is set, in which case they are
+    revalidated with If-None-Match/If-Modified-Since from the download index and only
+    re-downloaded when the server says they changed. A failed revalidation keeps the
+    existing file, so only first-time download failures return None.
+    """
+    save_path = image_save_path(image_url, save_dir, index)
+    filename = os.path.basename(save_path)
+    exists = os.path.exists(save_path)
+    if exists and not refresh:
+        return save_path
+
+    headers = {}
+    entry = download_index.get(filename) if download_index is not None else None
+    if exists and entry and entry.get("url") == image_url:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+    tmp_path = f"{save_path}.{threading.get_ident()}.part"
+    try:
+        session = get_session(urlparse(image_url).netloc)
+        with session.get(image_url, headers=headers, timeout=10, stream=True) as response:
+            if response.status_code == 304:
+                return save_path
+            response.raise_for_status()  # Raise an error for bad responses
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(tmp_path, save_path)
+
+            if download_index is not None:
+                download_index.put(filename, {
+                    "url": image_url,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                })
         return save_path
     except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if exists:
+            print(f"Couldn't revalidate {image_url}, keeping the existing file: {e}")
+            return save_path
         print(f"Failed to download {image_url}: {e}")
         return None
 
-import concurrent.futures
 
 # do this concurrently for speed
-def download_images_from_unified_dataset(unified_df, save_dir, max_workers=8):
+def download_images_from_unified_dataset(unified_df, save_dir, max_workers=8, refresh=False):
     """Download all images from the unified dataset concurrently."""
     if not os.path.exists(save_dir):
         os.makedirs(save_dir)
 
-    def download_single_image(args):
-        index, row = args
-        image_url = row['image_url']
-        return download_image(image_url, save_dir, index=index)
-
-    # Create list of arguments for concurrent processing
-    download_args = [(index, row) for index, row in unified_df.iterrows()]
+    download_index = DownloadIndex(save_dir)
     
     # Track failed downloads
     failed_indices = []
     
-    # Use ThreadPoolExecutor for concurrent downloads
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all download tasks
-        future_to_args = {executor.submit(download_single_image, args): args for args in download_args}
-        
-        # Process completed downloads with progress bar
-        for future in tqdm(concurrent.futures.as_completed(future_to_args), 
-                          total=len(download_args), 
-                          desc="Downloading images"):
+    def collect(done, pending):
+        for future in done:
+            index = pending.pop(future)
             try:
-                result = future.result()
-                if result is None:
-                    args = future_to_args[future]
-                    failed_indices.append(args[0])
-                    print(f"Failed to download image for index {args[0]}")
+                if future.result() is None:
+                    failed_indices.append(index)
+                    print(f"Failed to download image for index {index}")
             except Exception as exc:
-                args = future_to_args[future]
-                failed_indices.append(args[0])
-                print(f"Download generated an exception for index {args[0]}: {exc}")
+                failed_indices.append(index)
+                print(f"Download generated an exception for index {index}: {exc}")
+            progress.update(1)
+    
+    # Feed rows through a bounded set of in-flight downloads instead of one future per row up front
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            tqdm(total=len(unified_df), desc="Downloading images") as progress:
+        pending = {}
+        try:
+            for index, image_url in zip(unified_df.index, unified_df['image_url']):
+                if len(pending) >= max_workers * 2:
+                    done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                    collect(done, pending)
+                future = executor.submit(download_image, image_url, save_dir, index, download_index, refresh)
+                pending[future] = index
+            collect(concurrent.futures.wait(pending).done, pending)
+        finally:
+            download_index.save()
     
     return failed_indices
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download product images from the unified dataset")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Revalidate already-downloaded images with conditional requests")
+    args = parser.parse_args()
+    
     # # First, create the unified dataset
     # create_unified_dataset()
     
@@ -78,22 +174,22 @@ if __name__ == "__main__":
         print(f"Unified dataset not found at {unified_csv_path}. Please run the preprocessing step first.")
         exit(1)
     
-    unified_df = pd.read_csv(unified_csv_path)
+    unified_df = load_unified_dataset(unified_csv_path)
     print(f"Starting with {len(unified_df)} products")
     
     # Directory to save downloaded images
     images_save_dir = "./images"
     
     # Download images and get failed indices
-    failed_indices = download_images_from_unified_dataset(unified_df, images_save_dir)
+    failed_indices = download_images_from_unified_dataset(unified_df, images_save_dir, refresh=args.refresh)
     
     # Remove failed rows from CSV
     if failed_indices:
         print(f"Removing {len(failed_indices)} products with failed image downloads")
         unified_df_cleaned = unified_df.drop(index=failed_indices).reset_index(drop=True)
-        unified_df_cleaned.to_csv(unified_csv_path, index=False)
+        save_unified_dataset(unified_df_cleaned, unified_csv_path)
         print(f"CSV updated: {len(unified_df_cleaned)} products remaining")
     else:
         print("All downloads successful - no changes to CSV")
     
-    print(f"Images downloaded to {images_save_dir}")
\ No newline at end of file
+    print(f"Images downloaded to {images_save_dir}")
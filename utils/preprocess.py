@@ -1,139 +1,106 @@
 import os
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 
-def preprocess_alo_yoga(df):
-    """Preprocess Alo Yoga products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-    
-    # Universal columns only (100% present across all brands)
-    # No useful metadata in product_id (just index), so keep name as is
-    processed_df['name'] = df['name']
-    processed_df['product_url'] = df['product_url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'alo_yoga'
-    
-    return processed_df
+# Optional: pyarrow gives Arrow-backed string columns and a Parquet copy of the unified dataset
+try:
+    import pyarrow  # noqa: F401
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
 
-def preprocess_altardstate(df):
-    """Preprocess Altar'd State products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-    
-    # Universal columns only (100% present across all brands)
-    processed_df['name'] = df['name']
-    processed_df['product_url'] = df['url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'altardstate'
-    
-    return processed_df
+STRING_DTYPE = "string[pyarrow]" if HAS_PYARROW else str
 
-def preprocess_cupshe(df):
-    """Preprocess Cupshe products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-    
-    # Universal columns only (100% present across all brands)
-    processed_df['name'] = df['name']
-    processed_df['product_url'] = df['url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'cupshe'
-    
-    return processed_df
+UNIFIED_COLUMNS = ['name', 'product_url', 'image_url', 'source']
 
-def preprocess_edikted(df):
-    """Preprocess Edikted products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-    
-    # Universal columns only (100% present across all brands)
-    processed_df['name'] = df['name']
-    processed_df['product_url'] = df['url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'edikted'
-    
-    return processed_df
-
-def preprocess_gymshark(df):
-    """Preprocess Gymshark products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-
-    processed_df['name'] = df['product_id'].combine(df['name'], lambda id, name: f"{name} ({id})")
-    processed_df['product_url'] = df['url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'gymshark'
-    
-    return processed_df
+# Universal columns only (100% present across all brands), as they are named in each brand's CSV.
+# "name_id" appends the brand's product_id to the name ("Name (id)") where the id carries
+# useful metadata; elsewhere product_id is just an index, so the name is kept as is.
+BRAND_SCHEMAS = [
+    {"source": "alo_yoga", "file": "alo_yoga_products.csv",
+     "columns": {"name": "name", "product_url": "product_url", "image_url": "image_url"}},
+    {"source": "altardstate", "file": "altardstate_products.csv",
+     "columns": {"name": "name", "product_url": "url", "image_url": "image_url"}},
+    {"source": "cupshe", "file": "cupshe_products.csv",
+     "columns": {"name": "name", "product_url": "url", "image_url": "image_url"}},
+    {"source": "edikted", "file": "edikted_products.csv",
+     "columns": {"name": "name", "product_url": "url", "image_url": "image_url"}},
+    {"source": "gymshark", "file": "gymshark_products.csv",
+     "columns": {"name": "name", "product_url": "url", "image_url": "image_url"}, "name_id": "product_id"},
+    {"source": "nakd", "file": "nakd_products.csv",
+     "columns": {"name": "name", "product_url": "url", "image_url": "image_url"}},
+    {"source": "princess_polly", "file": "princess_polly.csv",
+     "columns": {"name": "title", "product_url": "product_url", "image_url": "image_url"}},
+    {"source": "vuori", "file": "vuori_products.csv",
+     "columns": {"name": "name", "product_url": "url", "image_url": "image_url"}, "name_id": "product_id"},
+]
 
-def preprocess_nakd(df):
-    """Preprocess NA-KD products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-    
-    # Universal columns only (100% present across all brands)
-    processed_df['name'] = df['name']
-    processed_df['product_url'] = df['url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'nakd'
-    
-    return processed_df
+def preprocess_brand(schema, data_dir="data"):
+    """Read one brand CSV (only the columns its schema needs) and map it onto the unified columns"""
+    filepath = os.path.join(data_dir, schema["file"])
+    columns = schema["columns"]
+    name_id = schema.get("name_id")
+    usecols = set(columns.values()) | ({name_id} if name_id else set())
+    df = pd.read_csv(filepath, usecols=list(usecols), dtype=STRING_DTYPE, keep_default_na=False)
+    
+    processed_df = pd.DataFrame({target: df[source] for target, source in columns.items()})
+    if name_id:
+        processed_df['name'] = processed_df['name'] + " (" + df[name_id] + ")"
+    processed_df['source'] = schema["source"]
+    
+    return processed_df[UNIFIED_COLUMNS]
 
-def preprocess_princess_polly(df):
-    """Preprocess Princess Polly products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-    
-    # Universal columns only (100% present across all brands)
-    # No useful metadata in product_id (just index), so keep name as is
-    processed_df['name'] = df['title']
-    processed_df['product_url'] = df['product_url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'princess_polly'
-    
-    return processed_df
-
-def preprocess_vuori(df):
-    """Preprocess Vuori products - keeping only universal columns"""
-    processed_df = pd.DataFrame()
-    
-    # Universal columns only (100% present across all brands)
-    processed_df['name'] = df['product_id'].combine(df['name'], lambda id, name: f"{name} ({id})")
-    processed_df['product_url'] = df['url']
-    processed_df['image_url'] = df['image_url']
-    processed_df['source'] = 'vuori'
-    
-    return processed_df
-
-def create_unified_dataset():
-    """Create a unified dataset from all CSV files"""
-    data_dir = "data"
-    csv_files = [
-        ("alo_yoga_products.csv", preprocess_alo_yoga),
-        ("altardstate_products.csv", preprocess_altardstate),
-        ("cupshe_products.csv", preprocess_cupshe),
-        ("edikted_products.csv", preprocess_edikted),
-        ("gymshark_products.csv", preprocess_gymshark),
-        ("nakd_products.csv", preprocess_nakd),
-        ("princess_polly.csv", preprocess_princess_polly),
-        ("vuori_products.csv", preprocess_vuori)
-    ]
+def create_unified_dataset(data_dir="data", max_workers=8):
+    """Create a unified dataset from all brand CSV files, parsing the brand files in parallel processes"""
+    schemas = []
+    for schema in BRAND_SCHEMAS:
+        if os.path.exists(os.path.join(data_dir, schema["file"])):
+            schemas.append(schema)
+        else:
+            print(f"File {schema['file']} not found!")
     
     unified_data = []
+    if schemas:
+        with ProcessPoolExecutor(max_workers=min(max_workers, len(schemas))) as executor:
+            unified_data = list(executor.map(preprocess_brand, schemas, [data_dir] * len(schemas)))
     
-    for filename, preprocess_func in csv_files:
-        filepath = os.path.join(data_dir, filename)
-        if os.path.exists(filepath):
-            print(f"Processing {filename}...")
-            df = pd.read_csv(filepath)
-            processed_df = preprocess_func(df)
-            unified_data.append(processed_df)
-            print(f"Processed {len(processed_df)} products from {filename}")
-        else:
-            print(f"File {filename} not found!")
+    for schema, processed_df in zip(schemas, unified_data):
+        print(f"Processed {len(processed_df)} products from {schema['file']}")
     
     # Combine all datasets
     if unified_data:
         final_df = pd.concat(unified_data, ignore_index=True)
+        final_df['source'] = final_df['source'].astype('category')
         print(f"\nTotal products in unified dataset: {len(final_df)}")
         return final_df
     else:
         print("No data to process!")
         return pd.DataFrame()
 
+def columnar_path_for(csv_path):
+    """Path of the Parquet copy written next to a unified CSV"""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+def save_unified_dataset(unified_df, output_path="data/all_products.csv"):
+    """Write the unified dataset as CSV, plus a Parquet copy when pyarrow is available"""
+    unified_df.to_csv(output_path, index=False)
+    print(f"\nUnified dataset saved to: {output_path}")
+    
+    if HAS_PYARROW:
+        columnar_path = columnar_path_for(output_path)
+        unified_df.to_parquet(columnar_path, index=False)
+        print(f"Columnar copy saved to: {columnar_path}")
+    else:
+        print("pyarrow not installed - skipping the Parquet copy")
+
+def load_unified_dataset(csv_path="data/all_products.csv"):
+    """Load the unified dataset, preferring the Parquet copy when it is at least as new as the CSV"""
+    columnar_path = columnar_path_for(csv_path)
+    if HAS_PYARROW and os.path.exists(columnar_path) and (
+            not os.path.exists(csv_path) or os.path.getmtime(columnar_path) >= os.path.getmtime(csv_path)):
+        return pd.read_parquet(columnar_path)
+    return pd.read_csv(csv_path)
+
 def main():
     """Main function to run preprocessing and create unified dataset"""
     print("Starting preprocessing of all CSV files...")
@@ -143,9 +110,7 @@ def main():
     
     if not unified_df.empty:
         # Save unified dataset
-        output_path = "data/all_products.csv"
-        unified_df.to_csv(output_path, index=False)
-        print(f"\nUnified dataset saved to: {output_path}")
+        save_unified_dataset(unified_df, "data/all_products.csv")
         
         # Display summary statistics
         print("\nDataset Summary:")